@@ -1,7 +1,11 @@
 """
 Application configuration using environment variables.
+
+`.env` is read once, here; everything else reads configuration through
+`get_settings()`.
 """
 
+import functools
 import os
 from dotenv import load_dotenv
 
@@ -17,7 +21,38 @@ class Settings:
     CORS_ORIGINS: list[str] = os.getenv(
         "CORS_ORIGINS", "http://localhost:3000"
     ).split(",")
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "50000"))
+
+    # Database connection
+    DB_USER: str = os.getenv("DB_USER", "root")
+    DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
+    DB_HOST: str = os.getenv("DB_HOST", "localhost")
+    DB_PORT: str = os.getenv("DB_PORT", "3306")
+    DB_NAME: str = os.getenv("DB_NAME", "smartspend")
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "False").lower() == "true"
+    # Full URLs may be given directly (e.g. sqlite:///smartspend.db and
+    # sqlite+aiosqlite:///smartspend.db to run locally without MySQL).
+    DATABASE_URL: str = os.getenv("DATABASE_URL") or (
+        f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL") or (
+        f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
+    # Create missing tables when the app starts (otherwise: python -m app.services.schema)
+    DB_CREATE_SCHEMA: bool = os.getenv("DB_CREATE_SCHEMA", "False").lower() == "true"
+
+    # Database engine / connection pool (per worker process)
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
 
 
+@functools.lru_cache(maxsize=None)
 def get_settings() -> Settings:
     return Settings()
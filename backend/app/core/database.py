@@ -1,35 +1,192 @@
 """
 Database configuration using SQLAlchemy ORM.
+
+Two session modes are available, selected with the `DB_ASYNC` setting:
+
+- sync (default): PyMySQL engine; handlers run in FastAPI's threadpool.
+- async: SQLAlchemy asyncio engine (aiomysql, or aiosqlite for local
+  testing); handlers run on the event loop through `AsyncSession.run_sync`,
+  so a request waiting on the database does not pin a worker thread.
+
+Route handlers are written once, as plain synchronous ORM code taking a
+`db: Session` argument, and decorated with `@db_handler` to run under
+whichever mode is configured. The purchase export is the exception: it
+streams from a `SessionLocal` session on the sync engine in both modes.
+
+Nothing here touches the database at import time. Engines are built on
+first use by `get_engine()` / `get_async_engine()` (and sessions from
+`SessionLocal` / `AsyncSessionLocal` bind to them when they first run a
+statement), so importing the app needs neither a reachable server nor the
+database driver.
 """
 
-import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable
 
-load_dotenv()
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_NAME = os.getenv("DB_NAME", "smartspend")
+from app.core.config import get_settings
+from app.core.metrics import instrument_engine
+
+
+# ── Connection pool ─────────────────────────────────────
+
+class PoolWaitStats:
+    """How long requests waited to check a connection out of the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "total_wait_ms": round(self.total_wait * 1000, 3),
+                "avg_wait_ms": round(self.total_wait * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    wait_stats = PoolWaitStats()
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+
+def _engine_options(url: str, poolclass) -> dict:
+    settings = get_settings()
+    options = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    # In-memory SQLite (tests) pins a single connection; pool sizing doesn't apply
+    in_memory = url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+    if not in_memory:
+        options.update(
+            poolclass=poolclass,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+
+@functools.lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """The sync engine, built on first use. Building it does not connect."""
+    url = get_settings().DATABASE_URL
+    engine = create_engine(url, **_engine_options(url, TimedQueuePool))
+    instrument_engine(engine)
+    return engine
+
+
+@functools.lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """The asyncio engine, built on first use (async mode only, so its driver stays optional)."""
+    url = get_settings().ASYNC_DATABASE_URL
+    engine = create_async_engine(url, **_engine_options(url, TimedAsyncQueuePool))
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+async def dispose_engines() -> None:
+    """Close the pools of whichever engines were built."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
+
+class _AppSession(Session):
+    """A session bound to `get_engine()` unless given a bind of its own."""
+
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None:
+            return get_engine()
+        return super().get_bind(mapper, **kwargs)
 
-DATABASE_URL = (
-    f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
 
-engine = create_engine(DATABASE_URL, echo=True)
+class _AppAsyncSyncSession(Session):
+    """The sync side of `AsyncSessionLocal` sessions, bound to `get_async_engine()`."""
+
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None:
+            return get_async_engine().sync_engine
+        return super().get_bind(mapper, **kwargs)
+
 
 SessionLocal = sessionmaker(
+    class_=_AppSession,
     autocommit=False,
     autoflush=False,
-    bind=engine
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=_AppAsyncSyncSession,
+    autoflush=False,
+    # Objects are serialised after the handler returns, outside the greenlet
+    # that can lazy-load, so they must stay populated after commit.
+    expire_on_commit=False,
 )
 
 Base = declarative_base()
 
 
+def pool_status() -> dict:
+    """Live statistics for each engine's connection pool."""
+    engines = [("sync", get_engine())]
+    if get_settings().DB_ASYNC:
+        engines.append(("async", get_async_engine().sync_engine))
+    status = {}
+    for name, eng in engines:
+        pool = eng.pool
+        entry = {"pool_class": type(pool).__name__, "status": pool.status()}
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                max_overflow=pool._max_overflow,
+                timeout_seconds=pool.timeout(),
+            )
+        if isinstance(pool, _TimedCheckoutMixin):
+            entry["wait"] = pool.wait_stats.as_dict()
+        status[name] = entry
+    return status
+
+
 def get_db():
     """
     FastAPI dependency for database session.
@@ -39,3 +196,58 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    FastAPI dependency for an asyncio database session.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+class SessionRunner:
+    """Runs synchronous ORM code against the configured session mode."""
+
+    def __init__(self, session: Session | AsyncSession):
+        self.session = session
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call `fn(session, *args)` without blocking the event loop."""
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args)
+        return await run_in_threadpool(fn, self.session, *args)
+
+
+async def _sync_runner(db: Session = Depends(get_db)):
+    return SessionRunner(db)
+
+
+async def _async_runner(db: AsyncSession = Depends(get_async_db)):
+    return SessionRunner(db)
+
+
+get_runner = _async_runner if get_settings().DB_ASYNC else _sync_runner
+
+
+def db_handler(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Adapt a sync route handler with a `db: Session` parameter into an async
+    endpoint whose `db` is provided by `get_runner`.
+
+    Place it below the `@router.<method>` decorator.
+    """
+    signature = inspect.signature(fn)
+    parameters = [
+        param.replace(annotation=SessionRunner, default=Depends(get_runner))
+        if name == "db" else param
+        for name, param in signature.parameters.items()
+    ]
+
+    @functools.wraps(fn)
+    async def endpoint(**kwargs):
+        runner: SessionRunner = kwargs.pop("db")
+        return await runner.run(lambda session: fn(db=session, **kwargs))
+
+    endpoint.__signature__ = signature.replace(parameters=parameters)
+    return endpoint
@@ -0,0 +1,145 @@
+"""
+Content negotiation for the bulk read endpoints.
+
+`GET /purchases/`, `GET /purchases/export` and the reference lists
+(`/products/`, `/users/`, `/shops/`, `/categories/`) answer in the format the
+client's Accept header prefers:
+
+- `application/json` (the default, also for `*/*` or no header at all)
+- `application/msgpack`: the same document as the JSON body, MessagePack
+  encoded (dates and datetimes as ISO 8601 strings, as in JSON)
+- `application/vnd.apache.arrow.stream`: an Arrow IPC stream with one
+  column per field, built column-wise from the query rows, which loads into
+  pandas with `pyarrow.ipc.open_stream(body).read_pandas()`
+
+pyarrow is only imported when an Arrow response is first built, so it adds
+nothing to startup for deployments whose clients never ask for it.
+"""
+
+import io
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+import msgpack
+from fastapi import Request
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Older names clients still send for the same formats
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+_OFFERED = (JSON, MSGPACK, ARROW)
+_SUFFIXES = {MSGPACK: "msgpack", ARROW: "arrow"}
+
+
+def negotiate(request: Request) -> str:
+    """The media type the client prefers among JSON, MessagePack and Arrow; JSON when it names none of them."""
+    header = request.headers.get("accept")
+    if not header:
+        return JSON
+    preferences = []
+    for position, part in enumerate(header.split(",")):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        media_type = media_type.lower()
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            preferences.append((-quality, position, _ALIASES.get(media_type, media_type)))
+    for _, _, media_type in sorted(preferences):
+        if media_type in _OFFERED:
+            return media_type
+        if media_type in ("*/*", "application/*"):
+            return JSON
+    return JSON
+
+
+def variant_etag(etag: str, media_type: str) -> str:
+    """The ETag of one representation: each format of the same data gets its own tag."""
+    if media_type == JSON:
+        return etag
+    return f'{etag[:-1]}-{_SUFFIXES[media_type]}"'
+
+
+def negotiated_headers(etag: str, **extra: str) -> dict[str, str]:
+    """Headers for a negotiated 200 or 304: the tag, `no-cache`, and `Vary: Accept` for shared caches."""
+    return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept", **extra}
+
+
+# ── MessagePack ─────────────────────────────────────────
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default)
+
+
+# ── Arrow ───────────────────────────────────────────────
+
+def _pyarrow():
+    import pyarrow
+    import pyarrow.ipc  # noqa: F401  (registers pyarrow.ipc)
+
+    return pyarrow
+
+
+def arrow_schema(fields: list[tuple[str, str]]):
+    """A schema from `(name, type alias)` pairs, e.g. `("date", "date32")`."""
+    pa = _pyarrow()
+    return pa.schema([(name, pa.type_for_alias(alias)) for name, alias in fields])
+
+
+def _array(pa, values: list, arrow_type):
+    # Numeric columns come back as Decimal; converting in Python is several
+    # times faster than letting Arrow build a decimal array and cast it.
+    if pa.types.is_floating(arrow_type):
+        values = [None if value is None else float(value) for value in values]
+    return pa.array(values, type=arrow_type)
+
+
+def arrow_batch(schema, columns: list[list]):
+    """A record batch from one list of values per schema field."""
+    pa = _pyarrow()
+    arrays = [_array(pa, values, field.type) for values, field in zip(columns, schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def arrow_rows_batch(schema, rows: list[tuple]):
+    """A record batch from result rows whose columns are in schema order."""
+    columns = [list(column) for column in zip(*rows)] if rows else [[] for _ in schema]
+    return arrow_batch(schema, columns)
+
+
+def arrow_stream(schema, batches: Iterable) -> Iterator[bytes]:
+    """Encode record batches as an Arrow IPC stream, yielding bytes as each batch is written."""
+    pa = _pyarrow()
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def arrow_table_bytes(columns: dict[str, list]) -> bytes:
+    """An Arrow stream for columns whose types Arrow infers from the values."""
+    pa = _pyarrow()
+    table = pa.table(columns)
+    return b"".join(arrow_stream(table.schema, table.to_batches()))
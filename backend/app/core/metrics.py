@@ -0,0 +1,190 @@
+"""
+Request and SQL instrumentation.
+
+- `MetricsMiddleware` times every request, counts responses per status and
+  adds a `Server-Timing` header (`db` = SQL time and statement count, `app` =
+  total time until the response started).
+- SQLAlchemy cursor events attribute statement counts and DB time to the
+  request that issued them, via a context variable.
+- `render_prometheus()` exports everything in the Prometheus text format for
+  the `/metrics` endpoint.
+
+Metrics are kept per worker process; Prometheus aggregates across workers.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    """SQL work done on behalf of one request."""
+
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current_request: ContextVar[RequestStats | None] = ContextVar("smartspend_request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.samples = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.samples += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.sql_statements: dict[tuple[str, str], Histogram] = {}
+        self.db_time: dict[tuple[str, str], Histogram] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.sql_statements.setdefault(key, Histogram(SQL_COUNT_BUCKETS)).observe(stats.statements)
+            self.db_time.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(stats.db_seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.sql_statements.clear()
+            self.db_time.clear()
+
+
+registry = MetricsRegistry()
+
+
+# ── SQLAlchemy hooks ────────────────────────────────────
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("smartspend_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["smartspend_query_start"].pop()
+    stats = _current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute this engine's statements to the current request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ── ASGI middleware ─────────────────────────────────────
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are not buffered."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+                    f"app;dur={elapsed_ms:.2f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timing.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            route = scope.get("route")
+            # Label by route template, never by raw path, to keep cardinality bounded
+            route_label = getattr(route, "path", None) or "unmatched"
+            registry.record(
+                scope["method"], route_label, status_code, time.perf_counter() - start, stats
+            )
+
+
+# ── Prometheus exposition ───────────────────────────────
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _render_histogram(lines: list[str], name: str, help_text: str, histograms: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), hist in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {hist.total}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {hist.samples}")
+
+
+def render_prometheus() -> str:
+    with registry._lock:
+        lines = [
+            "# HELP smartspend_http_requests_total HTTP responses by route and status.",
+            "# TYPE smartspend_http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(registry.requests.items()):
+            lines.append(
+                f"smartspend_http_requests_total{_labels(method=method, route=route, status=status)} {count}"
+            )
+        _render_histogram(
+            lines, "smartspend_http_request_duration_seconds",
+            "Request latency in seconds.", registry.latency,
+        )
+        _render_histogram(
+            lines, "smartspend_request_sql_statements",
+            "SQL statements executed per request.", registry.sql_statements,
+        )
+        _render_histogram(
+            lines, "smartspend_request_db_seconds",
+            "Cumulative database time per request in seconds.", registry.db_time,
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,23 @@
+"""
+Fast JSON encoding for responses.
+
+`ORJSONResponse` is the app's default response class, so every endpoint is
+encoded with orjson rather than the stdlib `json` module. The large list
+endpoints go further: they encode plain dicts built from column rows with
+`dumps` (or reuse bytes encoded once into the reference cache, see
+app.core.etag) and return them in a plain `Response`, which skips FastAPI's
+response-model validation and serialisation altogether. Their
+`response_model` still documents the shape in OpenAPI.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+__all__ = ["ORJSONResponse", "dumps"]
+
+
+def dumps(content: Any) -> bytes:
+    """orjson-encode `content` (naive datetimes as ISO 8601 without offset, like Pydantic)."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,9 @@
+"""
+Importers for the legacy Access CSV exports (products, order headers and
+order lines) into the live `products` / `purchases` / `purchase_items` tables.
+
+    python -m app.importers products --source scripts/data_import/raw
+    python -m app.importers orders --user-id 1 --shop Amway
+
+See `python -m app.importers --help` for all options.
+"""
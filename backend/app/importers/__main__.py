@@ -0,0 +1,122 @@
+"""
+Command-line entry point: `python -m app.importers products|orders ...`
+(or `scripts/smartspend-import ...`).
+"""
+
+import argparse
+import os
+import sys
+
+from sqlalchemy import inspect, select
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal, get_engine
+from app.importers.bulk import bulk_session_factory
+from app.importers.orders import DETAILS_FILE, ORDERS_FILE, import_orders
+from app.importers.pipeline import CHECKPOINT_NAME, ImportRun
+from app.importers.products import PRODUCTS_FILE, import_products
+from app.models.import_hash import ImportHash
+from app.models.shop import Shop
+from app.models.user import User
+from app.services.schema import create_schema
+
+DEFAULT_SOURCE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "scripts", "data_import", "raw",
+)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="smartspend-import",
+        description="Import the legacy Access CSV exports into SmartSpend.",
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--source", default=DEFAULT_SOURCE,
+        help="Directory holding the exported CSV files (default: %(default)s)",
+    )
+    common.add_argument(
+        "--chunk-size", type=int, default=get_settings().IMPORT_CHUNK_SIZE,
+        help="Rows read and committed per transaction (default: %(default)s)",
+    )
+    common.add_argument(
+        "--dry-run", action="store_true",
+        help="Run every stage and report counts, then roll everything back",
+    )
+    common.add_argument(
+        "--bulk", action="store_true",
+        help="Load each chunk into a staging table (LOAD DATA LOCAL INFILE on MySQL, "
+             "multi-row INSERTs elsewhere) and merge it with set-based SQL",
+    )
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("products", parents=[common], help=f"Upsert products from {PRODUCTS_FILE}")
+    orders = commands.add_parser(
+        "orders", parents=[common],
+        help=f"Upsert purchases and items from {ORDERS_FILE} and {DETAILS_FILE}",
+    )
+    orders.add_argument("--user-id", type=int, required=True, help="User the purchases belong to")
+    orders.add_argument("--shop", required=True, help="Shop name (created if missing)")
+    return parser
+
+
+def _resolve_owner(run: ImportRun, user_id: int, shop_name: str) -> int:
+    """Check the user exists and get-or-create the shop; returns the shop id."""
+    with run.transaction() as db:
+        if db.get(User, user_id) is None:
+            raise SystemExit(f"❌ User {user_id} not found.")
+        shop_id = db.scalar(select(Shop.id).where(Shop.name == shop_name))
+        if shop_id is None:
+            shop = Shop(name=shop_name)
+            db.add(shop)
+            db.flush()
+            shop_id = shop.id
+            print(f"➕ Created shop {shop_name!r} (id {shop_id}).")
+    return shop_id
+
+
+def _source_file(source: str, name: str) -> str:
+    path = os.path.join(source, name)
+    if not os.path.exists(path):
+        raise SystemExit(f"❌ File NOT FOUND: {path}")
+    return path
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    engine = get_engine()
+    # The table comes from the dated migrations (or create_schema, as at app startup)
+    if get_settings().DB_CREATE_SCHEMA:
+        create_schema(engine)
+    if not inspect(engine).has_table(ImportHash.__tablename__):
+        raise SystemExit("❌ Table import_hashes not found: apply database/18-10-26-importer.sql first.")
+
+    run = ImportRun(
+        bulk_session_factory(engine) if args.bulk else SessionLocal,
+        checkpoint_path=os.path.join(args.source, CHECKPOINT_NAME),
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+        bulk=args.bulk,
+    )
+    success = False
+    try:
+        if args.command == "products":
+            import_products(run, _source_file(args.source, PRODUCTS_FILE))
+        else:
+            orders_file = _source_file(args.source, ORDERS_FILE)
+            details_file = _source_file(args.source, DETAILS_FILE)
+            shop_id = _resolve_owner(run, args.user_id, args.shop)
+            import_orders(run, orders_file, details_file, args.user_id, shop_id)
+        success = True
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        if not args.dry_run:
+            print("   Rerun the same command to resume from the last committed chunk.")
+    finally:
+        run.finish(success)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Bulk-load mode (`--bulk`): each cleaned chunk is loaded into a staging table
+in one round trip and merged into the live tables with set-based SQL,
+instead of being sent row by row through the ORM.
+
+- On MySQL the chunk is written to a temporary tab-separated file and read
+  with `LOAD DATA LOCAL INFILE` (the connection needs `local_infile`, which
+  `bulk_session_factory` enables; the server must allow it too).
+- Other dialects, or a MySQL server that refuses local files, get the chunk
+  as multi-row `INSERT ... VALUES` statements of `INSERT_BATCH_ROWS` rows.
+
+Staging tables live in their own metadata, so the app's `create_all` never
+creates them; the importer does when `--bulk` is given. They are emptied at
+the start of every chunk, inside the chunk's transaction.
+"""
+
+import csv
+import os
+import tempfile
+
+import pandas as pd
+from sqlalchemy import (
+    DECIMAL,
+    Column,
+    Date,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.import_hash import ImportHash
+
+# Rows per multi-row INSERT: 1000 rows × 8 columns stays well below the
+# bind-parameter limits of SQLite (32766) and MySQL (65535).
+INSERT_BATCH_ROWS = 1000
+
+# MySQL errors meaning LOAD DATA LOCAL is disabled on the client or server
+_LOCAL_INFILE_REFUSED = {1148, 2068, 3948}
+
+staging_metadata = MetaData()
+
+staging_products = Table(
+    "import_staging_products", staging_metadata,
+    Column("reference", String(50), primary_key=True),
+    Column("name", String(200)),
+    Column("category", String(100)),
+    Column("unit_type", String(20)),
+    Column("content_hash", String(32)),
+)
+
+staging_orders = Table(
+    "import_staging_orders", staging_metadata,
+    Column("order_number", String(50), primary_key=True),
+    Column("date", Date),
+    Column("total_amount", DECIMAL(10, 2)),
+    Column("user_id", Integer),
+    Column("shop_id", Integer),
+    Column("content_hash", String(32)),
+)
+
+# One row per order line; `content_hash` is the hash of the whole order
+staging_items = Table(
+    "import_staging_items", staging_metadata,
+    Column("order_number", String(50), index=True),
+    Column("reference", String(50)),
+    Column("product_id", Integer),
+    Column("quantity", DECIMAL(10, 3)),
+    Column("unit_price", DECIMAL(10, 2)),
+    Column("subtotal", DECIMAL(10, 2)),
+    Column("content_hash", String(32)),
+)
+
+
+def bulk_session_factory(engine: Engine) -> sessionmaker:
+    """Sessions for bulk mode: on MySQL, a dedicated engine with LOAD DATA LOCAL enabled."""
+    if engine.dialect.name == "mysql":
+        engine = create_engine(engine.url, connect_args={"local_infile": True})
+    staging_metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+# ── Loading ─────────────────────────────────────────────
+
+class StagingLoader:
+    """Loads frames into a staging table, remembering if the server refused LOAD DATA."""
+
+    def __init__(self):
+        self.local_infile = True
+
+    def load(self, db: Session, table: Table, df: pd.DataFrame) -> None:
+        """Replace the contents of `table` with `df` (columns named as in the table)."""
+        db.execute(delete(table))
+        if df.empty:
+            return
+        if self.local_infile and db.get_bind().dialect.name == "mysql":
+            try:
+                _load_data_infile(db, table, df)
+                return
+            except DBAPIError as e:
+                if e.orig is None or e.orig.args[0] not in _LOCAL_INFILE_REFUSED:
+                    raise
+                print(f"⚠️  LOAD DATA LOCAL refused ({e.orig.args[1]}); using multi-row INSERTs.")
+                self.local_infile = False
+        _insert_batches(db, table, df)
+
+
+def _insert_batches(db: Session, table: Table, df: pd.DataFrame) -> None:
+    connection = db.connection()
+    dialect = connection.dialect
+    columns = [table.c[name] for name in df.columns]
+    processors = [column.type.bind_processor(dialect) for column in columns]
+    values = [
+        [None if pd.isna(value) else (process(value) if process else value) for value in series.tolist()]
+        for series, process in zip((df[name] for name in df.columns), processors)
+    ]
+    rows = list(zip(*values))
+
+    # One INSERT with a VALUES tuple per row, rendered as plain SQL once per
+    # batch size: compiling a statement with thousands of bound parameters
+    # through SQLAlchemy costs more than executing it.
+    placeholder = "?" if dialect.paramstyle == "qmark" else "%s"
+    prefix = "INSERT INTO {} ({}) VALUES ".format(
+        dialect.identifier_preparer.format_table(table),
+        ", ".join(dialect.identifier_preparer.format_column(column) for column in columns),
+    )
+    row_sql = "(" + ", ".join([placeholder] * len(columns)) + ")"
+    statements: dict[int, str] = {}
+    for start in range(0, len(rows), INSERT_BATCH_ROWS):
+        batch = rows[start:start + INSERT_BATCH_ROWS]
+        if len(batch) not in statements:
+            statements[len(batch)] = prefix + ", ".join([row_sql] * len(batch))
+        connection.exec_driver_sql(statements[len(batch)], tuple(v for row in batch for v in row))
+
+
+def _escape(series: pd.Series) -> pd.Series:
+    """Escape text for LOAD DATA's default `ESCAPED BY '\\'` handling."""
+    return (
+        series.str.replace("\\", "\\\\", regex=False)
+        .str.replace("\t", "\\t", regex=False)
+        .str.replace("\n", "\\n", regex=False)
+        .str.replace("\r", "\\r", regex=False)
+    )
+
+
+def _load_data_infile(db: Session, table: Table, df: pd.DataFrame) -> None:
+    frame = df.copy()
+    for column in frame.columns:
+        if frame[column].dtype == object or pd.api.types.is_string_dtype(frame[column]):
+            frame[column] = _escape(frame[column].astype("string"))
+
+    fd, path = tempfile.mkstemp(prefix=f"{table.name}-", suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            frame.to_csv(
+                fh, sep="\t", header=False, index=False, na_rep="\\N",
+                quoting=csv.QUOTE_NONE, lineterminator="\n",
+            )
+        columns = ", ".join(f"`{column}`" for column in frame.columns)
+        db.execute(text(
+            f"LOAD DATA LOCAL INFILE :path INTO TABLE `{table.name}` CHARACTER SET utf8mb4 "
+            rf"FIELDS TERMINATED BY '\t' LINES TERMINATED BY '\n' ({columns})"
+        ), {"path": path})
+    finally:
+        os.remove(path)
+
+
+# ── Set-based hash bookkeeping ──────────────────────────
+
+def drop_unchanged(db: Session, entity: str, table: Table, key: str) -> None:
+    """Delete staged rows whose `content_hash` matches the last import."""
+    db.execute(delete(table).where(exists().where(
+        ImportHash.entity == entity,
+        ImportHash.natural_key == table.c[key],
+        ImportHash.content_hash == table.c.content_hash,
+    )))
+
+
+def save_staged_hashes(db: Session, entity: str, table: Table, key: str) -> None:
+    """Record the staged rows' hashes in `import_hashes`, replacing older ones."""
+    db.execute(delete(ImportHash).where(
+        ImportHash.entity == entity, ImportHash.natural_key.in_(select(table.c[key]))
+    ))
+    db.execute(insert(ImportHash).from_select(
+        ["entity", "natural_key", "content_hash"],
+        select(literal(entity), table.c[key], table.c.content_hash).distinct(),
+    ))
+
+
+def count_rows(db: Session, table: Table, column: str | None = None) -> int:
+    """Staged rows, or distinct values of `column`."""
+    counted = func.count(table.c[column].distinct()) if column else func.count()
+    return db.scalar(select(counted).select_from(table))
@@ -0,0 +1,40 @@
+"""
+Column cleaning shared by the importers. Source files are read with every
+column as text, so each importer converts exactly the columns it uses.
+"""
+
+import pandas as pd
+
+
+def clean_price_column(series: pd.Series) -> pd.Series:
+    """"12,50 €" → 12.5; blanks become 0."""
+    return (
+        series.astype(str)
+        .str.replace(",", ".", regex=False)
+        .str.replace(r"[^0-9.\-]", "", regex=True)
+        .replace("", "0")
+        .astype(float)
+    )
+
+
+def clean_key_column(series: pd.Series) -> pd.Series:
+    """Trimmed text keys (references, order numbers); blanks become ""."""
+    return series.fillna("").astype(str).str.strip()
+
+
+def clean_quantity_column(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series.str.replace(",", ".", regex=False), errors="coerce").fillna(0)
+
+
+def clean_date_column(series: pd.Series) -> pd.Series:
+    """Day-first dates as `datetime.date` objects; unparseable values become None."""
+    parsed = pd.to_datetime(series, dayfirst=True, errors="coerce")
+    return pd.Series(
+        [None if pd.isna(ts) else ts.date() for ts in parsed], index=series.index, dtype=object
+    )
+
+
+def normalise_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Access exports pad and mix the case of header names."""
+    df.columns = df.columns.str.strip().str.upper()
+    return df
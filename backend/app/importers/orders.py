@@ -0,0 +1,350 @@
+"""
+Orders import: order headers (`Pedidos-cabecera.csv`) become purchases,
+upserted by `purchases.order_number`; order lines (`Pedidos-detalles.csv`)
+become their purchase items.
+
+The Access export has no user or shop, so every order is assigned to the
+user and shop given on the command line.
+"""
+
+import pandas as pd
+from sqlalchemy import delete, exists, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.importers import bulk
+from app.importers.cleaning import (
+    clean_date_column,
+    clean_key_column,
+    clean_price_column,
+    clean_quantity_column,
+    normalise_columns,
+)
+from app.importers.pipeline import (
+    ImportRun,
+    UnmatchedReport,
+    changed_rows,
+    content_hashes,
+    save_hashes,
+)
+from app.models.product import Product
+from app.models.purchase import Purchase
+from app.models.purchase_item import PurchaseItem
+from app.services import change_feed, spend_rollup
+
+ORDERS_FILE = "Pedidos-cabecera.csv"
+DETAILS_FILE = "Pedidos-detalles.csv"
+
+ORDER_NUMBER = "NUMERO DE PEDIDO"
+HEADER_COLUMNS = ["order_number", "date", "total_amount", "user_id", "shop_id"]
+
+
+def _purchase_ids(db: Session, order_numbers) -> dict[str, int]:
+    numbers = sorted(set(order_numbers))
+    if not numbers:
+        return {}
+    return dict(db.execute(
+        select(Purchase.order_number, Purchase.id).where(Purchase.order_number.in_(numbers))
+    ).all())
+
+
+# ── Order headers → purchases ───────────────────────────
+
+def _prepare_orders(run: ImportRun, chunk: pd.DataFrame, user_id: int, shop_id: int) -> pd.DataFrame:
+    chunk = normalise_columns(chunk)
+    orders = pd.DataFrame({
+        "order_number": clean_key_column(chunk[ORDER_NUMBER]),
+        "date": clean_date_column(chunk["FECHA"]),
+        "total_amount": clean_price_column(chunk["TOTAL"]),
+        "user_id": user_id,
+        "shop_id": shop_id,
+    })
+
+    invalid = orders["date"].isna() | (orders["order_number"] == "")
+    if invalid.any():
+        run.stats.add("purchases", skipped=int(invalid.sum()))
+    orders = orders[~invalid].drop_duplicates("order_number", keep="last")
+    orders["_hash"] = content_hashes(orders, HEADER_COLUMNS)
+    return orders
+
+
+def upsert_orders(db: Session, run: ImportRun, chunk: pd.DataFrame, user_id: int, shop_id: int) -> None:
+    orders = _prepare_orders(run, chunk, user_id, shop_id)
+
+    changed = changed_rows(db, "orders", orders, "order_number")
+    numbers = changed["order_number"].tolist()
+    existing = {
+        row.order_number: row
+        for row in db.execute(
+            select(Purchase.id, Purchase.order_number, Purchase.user_id, Purchase.shop_id, Purchase.date)
+            .where(Purchase.order_number.in_(numbers))
+        )
+    } if numbers else {}
+
+    records = changed[HEADER_COLUMNS].to_dict("records")
+    updates = [dict(record, id=existing[record["order_number"]].id)
+               for record in records if record["order_number"] in existing]
+    inserts = [record for record in records if record["order_number"] not in existing]
+
+    # Purchases moved to another user, shop or month take their spend with
+    # them; new purchases have no items yet
+    moved = [
+        record["id"] for record in updates
+        if _cell(record) != _cell(existing[record["order_number"]]._mapping)
+    ]
+    if moved:
+        spend_rollup.subtract_spend(db, Purchase.id.in_(moved))
+    if updates:
+        db.execute(update(Purchase), updates)
+    if inserts:
+        db.execute(insert(Purchase), inserts)
+    if numbers:
+        written = select(Purchase.id).where(Purchase.order_number.in_(numbers))
+        change_feed.record_changes(db, "purchases", written)
+    save_hashes(db, "orders", changed, "order_number")
+    if moved:
+        spend_rollup.add_spend(db, Purchase.id.in_(moved))
+
+    run.stats.add(
+        "purchases",
+        inserted=len(inserts), updated=len(updates), unchanged=len(orders) - len(changed),
+    )
+
+
+def merge_orders(db: Session, run: ImportRun, chunk: pd.DataFrame, user_id: int, shop_id: int) -> None:
+    """Bulk-mode `upsert_orders`: stage the chunk, then merge it with set-based SQL."""
+    orders = _prepare_orders(run, chunk, user_id, shop_id)
+    staged = bulk.staging_orders
+    run.staging.load(db, staged, orders[HEADER_COLUMNS].assign(content_hash=orders["_hash"]))
+    bulk.drop_unchanged(db, "orders", staged, "order_number")
+
+    table = Purchase.__table__
+    matches = table.c.order_number == staged.c.order_number
+    # Purchases moved to another user, shop or date take their spend with
+    # them. Looked up from the staged order numbers, so the purchases are
+    # read through their unique index rather than scanned.
+    moved = db.scalars(select(table.c.id).where(
+        table.c.order_number.in_(select(staged.c.order_number)),
+        ~exists().where(
+            matches,
+            table.c.user_id == staged.c.user_id,
+            table.c.shop_id == staged.c.shop_id,
+            table.c.date == staged.c.date,
+        ),
+    )).all()
+    if moved:
+        spend_rollup.subtract_spend(db, Purchase.id.in_(moved))
+    changed = bulk.count_rows(db, staged)
+    updated = db.scalar(select(func.count()).where(matches))
+
+    # UPDATE ... JOIN on MySQL, UPDATE ... FROM elsewhere
+    db.execute(update(table).where(matches).values(
+        {column: staged.c[column] for column in HEADER_COLUMNS if column != "order_number"}
+    ))
+    db.execute(insert(table).from_select(
+        HEADER_COLUMNS,
+        select(*(staged.c[column] for column in HEADER_COLUMNS)).where(~exists().where(matches)),
+    ))
+    change_feed.record_changes(
+        db, "purchases", select(table.c.id).where(table.c.order_number.in_(select(staged.c.order_number))),
+    )
+    bulk.save_staged_hashes(db, "orders", staged, "order_number")
+    if moved:
+        spend_rollup.add_spend(db, Purchase.id.in_(moved))
+
+    run.stats.add(
+        "purchases",
+        inserted=changed - updated, updated=updated, unchanged=len(orders) - changed,
+    )
+
+
+# ── Order lines → purchase items ────────────────────────
+
+def replace_items(
+    db: Session,
+    run: ImportRun,
+    chunk: pd.DataFrame,
+    product_ids: pd.DataFrame,
+    unmatched: UnmatchedReport,
+) -> None:
+    """
+    Replace the items of every purchase whose lines changed since the last import.
+
+    Lines are compared per order (a hash of all its matched lines), so the
+    chunk must hold complete orders: the stage runs with `group_key`.
+    """
+    lines = _clean_lines(chunk)
+
+    # Resolve order numbers and product references with two merges
+    # instead of one SELECT per line
+    purchase_ids = pd.DataFrame(
+        list(_purchase_ids(db, lines["ORDER_NUMBER"]).items()),
+        columns=["ORDER_NUMBER", "purchase_id"],
+    )
+    lines = (
+        lines
+        .merge(purchase_ids, on="ORDER_NUMBER", how="left")
+        .merge(product_ids, on="REFERENCE", how="left")
+    )
+    unmatched.add(lines)
+    matched = lines[lines["purchase_id"].notna() & lines["product_id"].notna()].copy()
+    matched["subtotal"] = (matched["quantity"] * matched["unit_price"]).round(2)
+    orders = _order_hashes(matched).merge(
+        matched.drop_duplicates("ORDER_NUMBER")[["ORDER_NUMBER", "purchase_id"]], on="ORDER_NUMBER"
+    )
+    changed = changed_rows(db, "order_items", orders, "ORDER_NUMBER")
+    changed_ids = [int(purchase_id) for purchase_id in changed["purchase_id"]]
+
+    if changed_ids:
+        spend_rollup.subtract_spend(db, Purchase.id.in_(changed_ids))
+        old_item_ids = db.scalars(
+            select(PurchaseItem.id).where(PurchaseItem.purchase_id.in_(changed_ids))
+        ).all()
+        db.execute(delete(PurchaseItem).where(PurchaseItem.purchase_id.in_(changed_ids)))
+        change_feed.record_changes(db, "purchase_items", old_item_ids, deleted=True)
+
+        replaced = matched[matched["ORDER_NUMBER"].isin(changed["ORDER_NUMBER"])]
+        db.execute(insert(PurchaseItem), [
+            {"purchase_id": int(purchase_id), "product_id": int(product_id),
+             "quantity": quantity, "unit_price": unit_price, "subtotal": subtotal}
+            for purchase_id, product_id, quantity, unit_price, subtotal in zip(
+                replaced["purchase_id"].tolist(), replaced["product_id"].tolist(),
+                replaced["quantity"].tolist(), replaced["unit_price"].tolist(),
+                replaced["subtotal"].tolist(),
+            )
+        ])
+        # New lines change the purchase, as in update_purchase
+        db.execute(
+            update(Purchase).where(Purchase.id.in_(changed_ids)).values(updated_at=func.now()),
+            execution_options={"synchronize_session": False},
+        )
+        change_feed.record_changes(db, "purchases", changed_ids)
+        spend_rollup.add_spend(db, Purchase.id.in_(changed_ids))
+    save_hashes(db, "order_items", changed, "ORDER_NUMBER")
+
+    run.stats.add(
+        "orders' items",
+        updated=len(changed), unchanged=len(orders) - len(changed),
+    )
+
+
+def merge_items(
+    db: Session,
+    run: ImportRun,
+    chunk: pd.DataFrame,
+    product_ids: pd.DataFrame,
+    unmatched: UnmatchedReport,
+) -> None:
+    """Bulk-mode `replace_items`: stage the lines, then replace changed orders' items in SQL."""
+    lines = _clean_lines(chunk).merge(product_ids, on="REFERENCE", how="left")
+    lines["subtotal"] = (lines["quantity"] * lines["unit_price"]).round(2)
+    known = lines[lines["product_id"].notna()]
+    lines = lines.merge(_order_hashes(known), on="ORDER_NUMBER", how="left")
+
+    staged = bulk.staging_items
+    run.staging.load(db, staged, pd.DataFrame({
+        "order_number": lines["ORDER_NUMBER"],
+        "reference": lines["REFERENCE"],
+        "product_id": lines["product_id"].astype("Int64"),
+        "quantity": lines["quantity"],
+        "unit_price": lines["unit_price"],
+        "subtotal": lines["subtotal"],
+        "content_hash": lines["_hash"],
+    }))
+
+    # Same outcome as `replace_items`: report and drop lines whose order or
+    # product is unknown, then skip orders whose lines hash is unchanged
+    purchases = Purchase.__table__
+    has_purchase = exists().where(purchases.c.order_number == staged.c.order_number)
+    missing_orders = select(func.count()).select_from(staged).where(~has_purchase)
+    unmatched.missing_orders += db.scalar(missing_orders)
+    db.execute(delete(staged).where(~has_purchase))
+    unmatched.missing_products.update(dict(db.execute(
+        select(staged.c.reference, func.count())
+        .where(staged.c.product_id.is_(None))
+        .group_by(staged.c.reference)
+    ).all()))
+    db.execute(delete(staged).where(staged.c.product_id.is_(None)))
+
+    orders = bulk.count_rows(db, staged, "order_number")
+    bulk.drop_unchanged(db, "order_items", staged, "order_number")
+    changed = bulk.count_rows(db, staged, "order_number")
+
+    items = PurchaseItem.__table__
+    changed_purchases = select(purchases.c.id).where(
+        purchases.c.order_number.in_(select(staged.c.order_number))
+    )
+    spend_rollup.subtract_spend(db, Purchase.id.in_(changed_purchases))
+    replaced_items = select(items.c.id).where(items.c.purchase_id.in_(changed_purchases))
+    change_feed.record_changes(db, "purchase_items", replaced_items, deleted=True)
+    db.execute(delete(items).where(items.c.purchase_id.in_(changed_purchases)))
+    db.execute(insert(items).from_select(
+        ["purchase_id", "product_id", "quantity", "unit_price", "subtotal"],
+        select(purchases.c.id, staged.c.product_id, staged.c.quantity, staged.c.unit_price, staged.c.subtotal)
+        .join_from(staged, purchases, purchases.c.order_number == staged.c.order_number),
+    ))
+    # Filtered by order number: MySQL can't UPDATE a table selected from in a subquery
+    is_changed = purchases.c.order_number.in_(select(staged.c.order_number))
+    db.execute(update(purchases).where(is_changed).values(updated_at=func.now()))
+    change_feed.record_changes(db, "purchases", changed_purchases)
+    spend_rollup.add_spend(db, Purchase.id.in_(changed_purchases))
+    bulk.save_staged_hashes(db, "order_items", staged, "order_number")
+
+    run.stats.add("orders' items", updated=changed, unchanged=orders - changed)
+
+
+def _cell(purchase) -> tuple[int, int, str]:
+    """The rollup (user, shop, month) of a purchase row or record."""
+    return int(purchase["user_id"]), int(purchase["shop_id"]), spend_rollup.month_key(purchase["date"])
+
+
+def _clean_lines(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = normalise_columns(chunk)
+    return pd.DataFrame({
+        "ORDER_NUMBER": clean_key_column(chunk[ORDER_NUMBER]),
+        "REFERENCE": clean_key_column(chunk["REFERENCIA PRODUCTO"]),
+        "quantity": clean_quantity_column(chunk["UNIDADES"]),
+        "unit_price": clean_price_column(chunk["PRECIO"]),
+    })
+
+
+def _order_hashes(matched: pd.DataFrame) -> pd.DataFrame:
+    """One hash per order (`ORDER_NUMBER`, `_hash`) over its sorted lines."""
+    matched = matched.assign(LINE=(
+        matched["REFERENCE"] + "|" + matched["quantity"].astype(str) + "|" + matched["unit_price"].astype(str)
+    ))
+    orders = (
+        matched.sort_values("LINE")
+        .groupby("ORDER_NUMBER", sort=False)
+        .agg(LINE=("LINE", "\n".join))
+        .reset_index()
+    )
+    orders["_hash"] = content_hashes(orders, ["LINE"])
+    return orders[["ORDER_NUMBER", "_hash"]]
+
+
+def _product_ids(db: Session) -> pd.DataFrame:
+    """The whole reference → product id map, loaded once per run (one row per product)."""
+    rows = db.execute(select(Product.reference, Product.id).where(Product.reference.is_not(None))).all()
+    products = pd.DataFrame(rows, columns=["REFERENCE", "product_id"])
+    products["REFERENCE"] = clean_key_column(products["REFERENCE"])
+    return products.drop_duplicates("REFERENCE")
+
+
+def import_orders(
+    run: ImportRun, orders_source: str, details_source: str, user_id: int, shop_id: int
+) -> None:
+    handle_orders, handle_items = (merge_orders, merge_items) if run.bulk else (upsert_orders, replace_items)
+    run.stage(
+        "purchases", orders_source,
+        lambda db, chunk: handle_orders(db, run, chunk, user_id, shop_id),
+    )
+
+    with run.transaction() as db:
+        product_ids = _product_ids(db)
+    unmatched = UnmatchedReport()
+    run.stage(
+        "purchase_items", details_source,
+        lambda db, chunk: handle_items(db, run, chunk, product_ids, unmatched),
+        group_key=ORDER_NUMBER,
+    )
+    unmatched.print()
@@ -0,0 +1,289 @@
+"""
+Chunked, resumable and incremental import plumbing.
+
+- Files are read `chunk_size` rows at a time with every column as text, and
+  each chunk is written and committed in its own transaction, so memory is
+  bounded by the chunk size rather than the size of the export.
+- After each commit the rows done are saved to a checkpoint file; a rerun
+  after a failure skips finished stages and resumes the interrupted one.
+- Each imported record's cleaned source values are hashed into
+  `import_hashes`; rows whose hash is unchanged are skipped, so a nightly run
+  only writes the delta.
+- In bulk mode (app.importers.bulk) chunks go through staging tables and
+  set-based SQL instead of per-row statements; the results are the same.
+- In dry-run mode every stage runs in one transaction that is rolled back at
+  the end, and the checkpoint is neither read nor written.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import pandas as pd
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.importers.bulk import StagingLoader
+from app.models.import_hash import ImportHash
+
+CSV_OPTIONS = {"sep": ";", "encoding": "cp1252"}
+CHECKPOINT_NAME = ".import_checkpoint.json"
+
+
+# ── Checkpoint ──────────────────────────────────────────
+
+class Checkpoint:
+    """
+    Progress of each import stage, persisted as JSON: rows committed so far
+    and whether the stage finished.
+
+    Each entry remembers the size and mtime of the source file; a new export
+    invalidates it and the stage starts over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stages: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                self.stages = json.load(fh)
+
+    @staticmethod
+    def _signature(source: str) -> list:
+        stat = os.stat(source)
+        return [stat.st_size, int(stat.st_mtime)]
+
+    def _entry(self, stage: str, source: str) -> dict | None:
+        entry = self.stages.get(stage)
+        if entry and entry["signature"] == self._signature(source):
+            return entry
+        return None
+
+    def rows_done(self, stage: str, source: str) -> int:
+        entry = self._entry(stage, source)
+        return entry["rows"] if entry else 0
+
+    def is_complete(self, stage: str, source: str) -> bool:
+        entry = self._entry(stage, source)
+        return bool(entry and entry["complete"])
+
+    def save(self, stage: str, source: str, rows: int, complete: bool = False) -> None:
+        self.stages[stage] = {
+            "signature": self._signature(source), "rows": rows, "complete": complete,
+        }
+        self._write()
+
+    def reset(self) -> None:
+        """Forget everything once the whole import has finished."""
+        self.stages = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _write(self) -> None:
+        # Write-then-rename so a crash never leaves a truncated checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(self.stages, fh)
+        os.replace(tmp_path, self.path)
+
+
+# ── Reporting ───────────────────────────────────────────
+
+class UpsertStats:
+    """Inserted / updated / unchanged / skipped counts per entity, across chunks."""
+
+    OUTCOMES = ("inserted", "updated", "unchanged", "skipped")
+
+    def __init__(self):
+        self.counts: dict[str, Counter] = {}
+
+    def add(self, entity: str, **outcomes: int) -> None:
+        self.counts.setdefault(entity, Counter()).update(outcomes)
+
+    def print(self) -> None:
+        for entity, counts in self.counts.items():
+            summary = ", ".join(
+                f"{counts[outcome]} {outcome}" for outcome in self.OUTCOMES if counts[outcome]
+            )
+            print(f"📊 {entity}: {summary or 'nothing to do'}")
+
+
+class UnmatchedReport:
+    """Order lines skipped because their order or product is unknown, across chunks."""
+
+    def __init__(self):
+        self.missing_orders = 0
+        self.missing_products: Counter = Counter()
+
+    def add(self, lines: pd.DataFrame) -> None:
+        missing_orders = lines["purchase_id"].isna()
+        missing_products = lines["product_id"].isna() & ~missing_orders
+        self.missing_orders += int(missing_orders.sum())
+        self.missing_products.update(lines.loc[missing_products, "REFERENCE"].tolist())
+
+    def print(self, limit: int = 20) -> None:
+        if self.missing_orders:
+            print(f"⚠️  {self.missing_orders} order lines skipped: order number not found.")
+        if self.missing_products:
+            total = sum(self.missing_products.values())
+            print(
+                f"⚠️  {total} order lines skipped: "
+                f"{len(self.missing_products)} unknown product references."
+            )
+            for reference, count in self.missing_products.most_common(limit):
+                print(f"     {reference}: {count} rows")
+            if len(self.missing_products) > limit:
+                print(f"     ... and {len(self.missing_products) - limit} more")
+
+
+# ── Content hashes ──────────────────────────────────────
+
+def content_hashes(df: pd.DataFrame, columns: list[str]) -> list[str]:
+    """md5 of each row's values, in column order."""
+    values = zip(*(df[column].tolist() for column in columns))
+    return [
+        hashlib.md5("\x1f".join(map(str, row)).encode("utf-8")).hexdigest()
+        for row in values
+    ]
+
+
+def changed_rows(db: Session, entity: str, df: pd.DataFrame, key_column: str) -> pd.DataFrame:
+    """Rows of `df` whose `_hash` differs from the last import (or that are new)."""
+    keys = sorted(set(df[key_column]))
+    previous = dict(db.execute(
+        select(ImportHash.natural_key, ImportHash.content_hash)
+        .where(ImportHash.entity == entity, ImportHash.natural_key.in_(keys))
+    ).all()) if keys else {}
+    return df[df[key_column].map(previous) != df["_hash"]]
+
+
+def save_hashes(db: Session, entity: str, df: pd.DataFrame, key_column: str) -> None:
+    if df.empty:
+        return
+    keys = df[key_column].tolist()
+    db.execute(delete(ImportHash).where(ImportHash.entity == entity, ImportHash.natural_key.in_(keys)))
+    db.execute(insert(ImportHash), [
+        {"entity": entity, "natural_key": key, "content_hash": digest}
+        for key, digest in zip(keys, df["_hash"].tolist())
+    ])
+
+
+# ── Running stages ──────────────────────────────────────
+
+def _split_trailing_group(chunk: pd.DataFrame, group_key: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Split off the rows of the last `group_key` value, which may continue in the next chunk."""
+    column = next(c for c in chunk.columns if c.strip().upper() == group_key)
+    keys = chunk[column]
+    last = keys.iloc[-1]
+    cut = len(chunk)
+    while cut > 0 and keys.iloc[cut - 1] == last:
+        cut -= 1
+    return chunk.iloc[:cut], chunk.iloc[cut:]
+
+
+class ImportRun:
+    """Shared state of one importer invocation (session factory, checkpoint, mode, stats)."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        checkpoint_path: str,
+        chunk_size: int,
+        dry_run: bool = False,
+        bulk: bool = False,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.bulk = bulk
+        self.staging = StagingLoader()
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.stats = UpsertStats()
+        self._dry_session: Session | None = None
+
+    @contextmanager
+    def transaction(self) -> Iterator[Session]:
+        """A committed transaction per call, or the single rolled-back one in dry-run mode."""
+        if self.dry_run:
+            if self._dry_session is None:
+                self._dry_session = self.session_factory()
+            yield self._dry_session
+            self._dry_session.flush()
+            return
+        with self.session_factory() as db, db.begin():
+            yield db
+
+    def stage(
+        self,
+        name: str,
+        source: str,
+        handle_chunk: Callable[[Session, pd.DataFrame], None],
+        group_key: str | None = None,
+    ) -> int:
+        """
+        Stream `source` through `handle_chunk(db, chunk)`, one transaction per chunk.
+
+        With `group_key`, rows sharing that column's value are never split
+        across chunks (the file must list each group contiguously): the
+        trailing group of a chunk is held back and processed with the next one.
+        Returns the number of rows processed this run.
+        """
+        checkpoint = None if self.dry_run else self.checkpoint
+        if checkpoint and checkpoint.is_complete(name, source):
+            print(f"⏭️  {name}: already imported, skipping.")
+            return 0
+
+        done = checkpoint.rows_done(name, source) if checkpoint else 0
+        if done:
+            print(f"↪️  {name}: resuming after {done} rows.")
+
+        start = time.perf_counter()
+        processed = 0
+
+        def process(chunk: pd.DataFrame) -> None:
+            nonlocal processed
+            with self.transaction() as db:
+                handle_chunk(db, chunk)
+            processed += len(chunk)
+            if checkpoint:
+                checkpoint.save(name, source, done + processed)
+            elapsed = time.perf_counter() - start
+            print(f"   {name}: {done + processed} rows ({processed / elapsed:,.0f} rows/s)")
+
+        held_back = None
+        for chunk in pd.read_csv(
+            source,
+            dtype=str,
+            chunksize=self.chunk_size,
+            skiprows=range(1, done + 1),  # Keep the header line
+            **CSV_OPTIONS,
+        ):
+            if held_back is not None:
+                chunk = pd.concat([held_back, chunk], ignore_index=True)
+            if group_key is not None:
+                chunk, held_back = _split_trailing_group(chunk, group_key)
+            if len(chunk):
+                process(chunk)
+        if held_back is not None and len(held_back):
+            process(held_back)
+
+        if checkpoint:
+            checkpoint.save(name, source, done + processed, complete=True)
+        elapsed = time.perf_counter() - start
+        rate = processed / elapsed if elapsed else 0.0
+        print(f"✅ {name}: {processed} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+        return processed
+
+    def finish(self, success: bool) -> None:
+        self.stats.print()
+        if self.dry_run:
+            if self._dry_session is not None:
+                self._dry_session.rollback()
+                self._dry_session.close()
+            print("🧪 Dry run: all changes rolled back.")
+        elif success:
+            self.checkpoint.reset()
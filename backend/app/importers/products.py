@@ -0,0 +1,133 @@
+"""
+Products import (`Productos.csv`), upserted by `products.reference`.
+"""
+
+import pandas as pd
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.importers import bulk
+from app.importers.cleaning import clean_key_column
+from app.importers.pipeline import ImportRun, changed_rows, content_hashes, save_hashes
+from app.models.product import Product
+from app.services import change_feed, spend_rollup
+
+PRODUCTS_FILE = "Productos.csv"
+
+COLUMNS = ["reference", "name", "category", "unit_type"]
+
+
+def clean_products(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns={
+        "Refencia": "reference",
+        "Descripcion": "name",
+        "Marca": "brand",
+    })
+    # Rows without a name are blank lines in the Access export
+    df = df.dropna(subset=["name"])
+    df = df[df["name"].str.strip() != ""]
+
+    return pd.DataFrame({
+        "reference": clean_key_column(df["reference"]),
+        "name": df["name"].str.strip(),
+        "category": df["brand"].fillna("General").str.strip(),
+        "unit_type": "unit",
+    })
+
+
+def _prepare(run: ImportRun, chunk: pd.DataFrame) -> pd.DataFrame:
+    products = clean_products(chunk)
+
+    # The reference is the upsert key; rows without one can't be matched
+    missing = products["reference"] == ""
+    if missing.any():
+        run.stats.add("products", skipped=int(missing.sum()))
+    products = products[~missing].drop_duplicates("reference", keep="last")
+    products["_hash"] = content_hashes(products, COLUMNS)
+    return products
+
+
+def upsert_products(db: Session, run: ImportRun, chunk: pd.DataFrame) -> None:
+    products = _prepare(run, chunk)
+
+    changed = changed_rows(db, "products", products, "reference")
+    existing = {
+        row.reference: row
+        for row in db.execute(
+            select(Product.id, Product.reference, Product.category)
+            .where(Product.reference.in_(changed["reference"].tolist()))
+        )
+    }
+
+    records = changed[COLUMNS].to_dict("records")
+    updates = [dict(record, id=existing[record["reference"]].id)
+               for record in records if record["reference"] in existing]
+    inserts = [record for record in records if record["reference"] not in existing]
+
+    # Re-categorised products move spend between rollup categories
+    recategorised = [
+        record["id"] for record in updates
+        if existing[record["reference"]].category != record["category"]
+    ]
+    if recategorised:
+        spend_rollup.subtract_spend(db, spend_rollup.with_products(recategorised))
+    if updates:
+        db.execute(update(Product), updates)
+    if inserts:
+        db.execute(insert(Product), inserts)
+    if records:
+        written = select(Product.id).where(Product.reference.in_(changed["reference"].tolist()))
+        change_feed.record_changes(db, "products", written)
+    save_hashes(db, "products", changed, "reference")
+    if recategorised:
+        spend_rollup.add_spend(db, spend_rollup.with_products(recategorised))
+
+    run.stats.add(
+        "products",
+        inserted=len(inserts), updated=len(updates), unchanged=len(products) - len(changed),
+    )
+
+
+def merge_products(db: Session, run: ImportRun, chunk: pd.DataFrame) -> None:
+    """Bulk-mode `upsert_products`: stage the chunk, then merge it with set-based SQL."""
+    products = _prepare(run, chunk)
+    staged = bulk.staging_products
+    run.staging.load(db, staged, products[COLUMNS].assign(content_hash=products["_hash"]))
+    bulk.drop_unchanged(db, "products", staged, "reference")
+
+    table = Product.__table__
+    matches = table.c.reference == staged.c.reference
+    # From the staged references, so products are read through their index
+    recategorised = db.scalars(select(table.c.id).where(
+        table.c.reference.in_(select(staged.c.reference)),
+        ~exists().where(matches, table.c.category == staged.c.category),
+    )).all()
+    changed = bulk.count_rows(db, staged)
+    updated = db.scalar(select(func.count()).where(matches))
+    if recategorised:
+        spend_rollup.subtract_spend(db, spend_rollup.with_products(list(recategorised)))
+
+    # UPDATE ... JOIN on MySQL, UPDATE ... FROM elsewhere
+    db.execute(update(table).where(matches).values(
+        {column: staged.c[column] for column in COLUMNS if column != "reference"}
+    ))
+    db.execute(insert(table).from_select(
+        COLUMNS,
+        select(*(staged.c[column] for column in COLUMNS)).where(~exists().where(matches)),
+    ))
+    change_feed.record_changes(
+        db, "products", select(table.c.id).where(table.c.reference.in_(select(staged.c.reference))),
+    )
+    bulk.save_staged_hashes(db, "products", staged, "reference")
+    if recategorised:
+        spend_rollup.add_spend(db, spend_rollup.with_products(list(recategorised)))
+
+    run.stats.add(
+        "products",
+        inserted=changed - updated, updated=updated, unchanged=len(products) - changed,
+    )
+
+
+def import_products(run: ImportRun, source: str) -> None:
+    handle = merge_products if run.bulk else upsert_products
+    run.stage("products", source, lambda db, chunk: handle(db, run, chunk))
@@ -1,19 +1,37 @@
 """
 SmartSpend API — Main application entry point.
+
+Importing this module has no side effects on the database: engines are
+built on first use, and tables are only created at startup when
+`DB_CREATE_SCHEMA` is set (otherwise run `python -m app.services.schema`).
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.core.cache import reference_cache
 from app.core.config import get_settings
-from app.core.database import engine, Base
-from app.routers import users, products, shops, purchases, categories
+from app.core.database import dispose_engines, pool_status
+from app.core.metrics import MetricsMiddleware, render_prometheus
+from app.core.responses import ORJSONResponse
+from app.routers import users, products, shops, purchases, categories, analytics, feed
 
+settings = get_settings()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
-settings = get_settings()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_CREATE_SCHEMA:
+        from app.services.schema import create_schema
+
+        await run_in_threadpool(create_schema)
+    yield
+    await dispose_engines()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -21,9 +39,16 @@ app = FastAPI(
     description="Personal expense tracking system",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 
+# Request / SQL instrumentation (Prometheus /metrics + Server-Timing header);
+# engines instrument themselves when they are built
+app.add_middleware(MetricsMiddleware)
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
 
@@ -40,6 +66,8 @@ app.include_router(products.router, prefix="/products", tags=["Products"])
 app.include_router(shops.router, prefix="/shops", tags=["Shops"])
 app.include_router(purchases.router, prefix="/purchases", tags=["Purchases"])
 app.include_router(categories.router, prefix="/categories", tags=["Categories"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+app.include_router(feed.router, prefix="/feed", tags=["Feed"])
 
 
 @app.get("/", tags=["Health"])
@@ -54,3 +82,21 @@ def root():
 @app.get("/health", tags=["Health"])
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/cache", tags=["Health"])
+def cache_stats():
+    """Hit/miss counters of the in-process reference-data cache."""
+    return reference_cache.stats()
+
+
+@app.get("/health/db-pool", tags=["Health"])
+def db_pool_stats():
+    """Connection pool usage for this worker (size it per worker from these)."""
+    return pool_status()
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint (per worker process)."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -4,3 +4,7 @@ from .shop import Shop
 from .category import Category
 from .purchase import Purchase
 from .purchase_item import PurchaseItem
+from .monthly_spend import MonthlySpend
+from .change_log import ChangeLog
+from .import_hash import ImportHash
+from .collection_version import CollectionVersion
@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, Boolean, Column, Index, Integer, String
+
+from app.core.database import Base
+
+
+class ChangeLog(Base):
+    """
+    One row written or deleted by a committed transaction, for the change feed.
+
+    Written automatically by app.services.change_feed when the transaction
+    commits. `version` is the commit's position in the "changes" sequence
+    (app.services.collection_versions), so it follows commit order.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_table_version", "table_name", "version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    table_name = Column(String(50), nullable=False)
+    record_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.core.database import Base
+
+
+class CollectionVersion(Base):
+    """
+    Write version of a collection the API serves with an ETag.
+
+    Bumped automatically by app.services.collection_versions when a
+    transaction that changed the collection commits.
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String(50), primary_key=True)  # "purchases"
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String
+
+from app.core.database import Base
+
+
+class ImportHash(Base):
+    """
+    Content hash of the source row each imported record was last loaded from.
+
+    The importer (app.importers) skips rows whose hash is unchanged, so a
+    re-import only writes what changed in the export.
+    """
+    __tablename__ = "import_hashes"
+
+    entity = Column(String(20), primary_key=True)        # "products", "orders", "order_items"
+    natural_key = Column(String(100), primary_key=True)  # product reference / order number
+    content_hash = Column(String(32), nullable=False)
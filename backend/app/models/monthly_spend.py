@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DECIMAL, UniqueConstraint
+
+from app.core.database import Base
+
+
+class MonthlySpend(Base):
+    """
+    Rollup of line-item spend per user × shop × category × month.
+
+    Derived data: rows are recomputed by app.services.spend_rollup whenever
+    the purchases they summarise change, and can be rebuilt from scratch.
+    """
+    __tablename__ = "monthly_spend"
+    __table_args__ = (
+        UniqueConstraint("user_id", "shop_id", "category", "month", name="uq_monthly_spend_cell"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(Integer, nullable=False)
+    shop_id = Column(Integer, nullable=False)
+    category = Column(String(100), nullable=False)
+    month = Column(String(7), nullable=False, index=True)  # "YYYY-MM"
+
+    total_amount = Column(DECIMAL(12, 2), nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    receipt_count = Column(Integer, nullable=False, default=0)
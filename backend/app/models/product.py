@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,6 +7,10 @@ from app.core.database import Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Category breakdowns and filters match on the category name
+        Index("ix_products_category", "category"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     reference = Column(String(50), unique=True, nullable=True)
@@ -17,5 +21,6 @@ class Product(Base):
         default="unit"
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     purchase_items = relationship("PurchaseItem", back_populates="product")
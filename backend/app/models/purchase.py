@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, DECIMAL
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,6 +7,14 @@ from app.core.database import Base
 
 class Purchase(Base):
     __tablename__ = "purchases"
+    # Lists, exports and analytics filter by user or shop and a date range,
+    # newest first; the primary key rides along in each secondary index, so
+    # these also serve the (date, id) keyset order.
+    __table_args__ = (
+        Index("ix_purchases_date", "date"),
+        Index("ix_purchases_user_date", "user_id", "date"),
+        Index("ix_purchases_shop_date", "shop_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -15,6 +23,9 @@ class Purchase(Base):
 
     date = Column(Date, nullable=False)
 
+    # Order number of purchases loaded by the importer (app.importers)
+    order_number = Column(String(50), unique=True, nullable=True)
+
     delivery_cost = Column(DECIMAL(10, 2), default=0.00)
     discount = Column(DECIMAL(10, 2), default=0.00)
     total_amount = Column(DECIMAL(10, 2), default=0.00)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class PurchaseItem(Base):
     __tablename__ = "purchase_items"
+    __table_args__ = (
+        Index("ix_purchase_items_purchase_id", "purchase_id"),
+        Index("ix_purchase_items_product_id", "product_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -11,5 +11,6 @@ class Shop(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), unique=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     purchases = relationship("Purchase", back_populates="shop", cascade="all, delete")
@@ -0,0 +1,258 @@
+"""
+Spending analytics computed in SQL (GROUP BY) so clients only receive the
+aggregated rows instead of the full purchase history.
+"""
+
+from datetime import date as date_type, timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.database import db_handler, get_db
+from app.models.purchase import Purchase
+from app.models.purchase_item import PurchaseItem
+from app.models.product import Product
+from app.models.shop import Shop
+from app.models.user import User
+from app.models.monthly_spend import MonthlySpend
+from app.schemas.analytics import SpendSummary, SpendGroup, SpendBreakdown
+from app.services.spend_rollup import UNCATEGORISED, month_key
+
+router = APIRouter()
+
+# strftime / DATE_FORMAT patterns per dialect; ISO weeks where the DB supports them
+PERIOD_FORMATS = {
+    "mysql": {"month": "%Y-%m", "week": "%x-W%v"},
+    "sqlite": {"month": "%Y-%m", "week": "%Y-W%W"},
+}
+
+
+def _spend_filters(
+    date_from: date_type | None = None,
+    date_to: date_type | None = None,
+    user_id: int | None = None,
+    shop_id: int | None = None,
+) -> dict:
+    """Shared query parameters for every analytics endpoint."""
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "user_id": user_id,
+        "shop_id": shop_id,
+    }
+
+
+def _purchase_conditions(filters: dict) -> list:
+    """The filters as SQL conditions on `purchases`."""
+    conditions = []
+    if filters["date_from"] is not None:
+        conditions.append(Purchase.date >= filters["date_from"])
+    if filters["date_to"] is not None:
+        conditions.append(Purchase.date <= filters["date_to"])
+    if filters["user_id"] is not None:
+        conditions.append(Purchase.user_id == filters["user_id"])
+    if filters["shop_id"] is not None:
+        conditions.append(Purchase.shop_id == filters["shop_id"])
+    return conditions
+
+
+def _rollup_conditions(filters: dict) -> list | None:
+    """
+    The filters as SQL conditions on `monthly_spend`, or None when the date
+    range doesn't fall on month boundaries and the rollup can't answer exactly.
+    """
+    date_from, date_to = filters["date_from"], filters["date_to"]
+    if date_from is not None and date_from.day != 1:
+        return None
+    if date_to is not None and (date_to + timedelta(days=1)).day != 1:
+        return None
+
+    conditions = []
+    if date_from is not None:
+        conditions.append(MonthlySpend.month >= month_key(date_from))
+    if date_to is not None:
+        conditions.append(MonthlySpend.month <= month_key(date_to))
+    if filters["user_id"] is not None:
+        conditions.append(MonthlySpend.user_id == filters["user_id"])
+    if filters["shop_id"] is not None:
+        conditions.append(MonthlySpend.shop_id == filters["shop_id"])
+    return conditions
+
+
+def _period_expr(db: Session, granularity: str):
+    dialect = db.get_bind().dialect.name
+    fmt = PERIOD_FORMATS.get(dialect, PERIOD_FORMATS["mysql"])[granularity]
+    if dialect == "sqlite":
+        return func.strftime(fmt, Purchase.date)
+    return func.date_format(Purchase.date, fmt)
+
+
+def _header_groups(db: Session, key_expr, conditions: list, label_expr=None, join=None) -> list[SpendGroup]:
+    """Aggregate purchase headers (totals include delivery and discounts)."""
+    columns = [
+        key_expr.label("key"),
+        func.coalesce(func.sum(Purchase.total_amount), 0).label("total"),
+        func.count(Purchase.id).label("purchases"),
+    ]
+    group_by = [key_expr]
+    if label_expr is not None:
+        columns.append(label_expr.label("label"))
+        group_by.append(label_expr)
+
+    query = db.query(*columns).select_from(Purchase)
+    if join is not None:
+        query = query.join(*join)
+    query = query.filter(*conditions).group_by(*group_by).order_by(key_expr)
+
+    return [
+        SpendGroup(
+            key=str(row.key),
+            label=row.label if label_expr is not None else None,
+            total_spent=round(float(row.total), 2),
+            purchase_count=row.purchases,
+            average_purchase=round(float(row.total) / row.purchases, 2) if row.purchases else 0.0,
+        )
+        for row in query
+    ]
+
+
+@router.get("/summary", response_model=SpendSummary)
+@db_handler
+def get_summary(
+    filters: dict = Depends(_spend_filters),
+    db: Session = Depends(get_db),
+):
+    """Overall spend, receipt and line-item counts for the filtered range."""
+    conditions = _purchase_conditions(filters)
+    total, purchases = (
+        db.query(
+            func.coalesce(func.sum(Purchase.total_amount), 0),
+            func.count(Purchase.id),
+        )
+        .filter(*conditions)
+        .one()
+    )
+
+    rollup_conditions = _rollup_conditions(filters)
+    if rollup_conditions is not None:
+        items = (
+            db.query(func.coalesce(func.sum(MonthlySpend.item_count), 0))
+            .filter(*rollup_conditions)
+            .scalar()
+        )
+    else:
+        items = (
+            db.query(func.count(PurchaseItem.id))
+            .join(Purchase, PurchaseItem.purchase_id == Purchase.id)
+            .filter(*conditions)
+            .scalar()
+        )
+    return SpendSummary(
+        total_spent=round(float(total), 2),
+        purchase_count=purchases,
+        item_count=items,
+        average_purchase=round(float(total) / purchases, 2) if purchases else 0.0,
+    )
+
+
+@router.get("/by-period", response_model=SpendBreakdown)
+@db_handler
+def get_spend_by_period(
+    granularity: str = Query("month", pattern="^(month|week)$"),
+    filters: dict = Depends(_spend_filters),
+    db: Session = Depends(get_db),
+):
+    period = _period_expr(db, granularity)
+    return SpendBreakdown(
+        group_by=granularity,
+        groups=_header_groups(db, period, _purchase_conditions(filters)),
+    )
+
+
+@router.get("/by-shop", response_model=SpendBreakdown)
+@db_handler
+def get_spend_by_shop(
+    filters: dict = Depends(_spend_filters),
+    db: Session = Depends(get_db),
+):
+    groups = _header_groups(
+        db,
+        Purchase.shop_id,
+        _purchase_conditions(filters),
+        label_expr=Shop.name,
+        join=(Shop, Purchase.shop_id == Shop.id),
+    )
+    return SpendBreakdown(group_by="shop", groups=groups)
+
+
+@router.get("/by-user", response_model=SpendBreakdown)
+@db_handler
+def get_spend_by_user(
+    filters: dict = Depends(_spend_filters),
+    db: Session = Depends(get_db),
+):
+    groups = _header_groups(
+        db,
+        Purchase.user_id,
+        _purchase_conditions(filters),
+        label_expr=User.name,
+        join=(User, Purchase.user_id == User.id),
+    )
+    return SpendBreakdown(group_by="user", groups=groups)
+
+
+@router.get("/by-category", response_model=SpendBreakdown)
+@db_handler
+def get_spend_by_category(
+    filters: dict = Depends(_spend_filters),
+    db: Session = Depends(get_db),
+):
+    """
+    Line-item spend per product category (item subtotals, before delivery/discount).
+
+    Served from the `monthly_spend` rollup when the date range is month-aligned
+    (or absent), otherwise aggregated from the line items directly.
+    """
+    rollup_conditions = _rollup_conditions(filters)
+    if rollup_conditions is not None:
+        rows = (
+            db.query(
+                MonthlySpend.category.label("category"),
+                func.sum(MonthlySpend.total_amount).label("total"),
+                func.sum(MonthlySpend.receipt_count).label("purchases"),
+                func.sum(MonthlySpend.item_count).label("items"),
+            )
+            .filter(*rollup_conditions)
+            .group_by(MonthlySpend.category)
+            .order_by(func.sum(MonthlySpend.total_amount).desc())
+            .all()
+        )
+    else:
+        category = func.coalesce(Product.category, UNCATEGORISED)
+        rows = (
+            db.query(
+                category.label("category"),
+                func.sum(PurchaseItem.subtotal).label("total"),
+                func.count(func.distinct(PurchaseItem.purchase_id)).label("purchases"),
+                func.count(PurchaseItem.id).label("items"),
+            )
+            .join(Product, PurchaseItem.product_id == Product.id)
+            .join(Purchase, PurchaseItem.purchase_id == Purchase.id)
+            .filter(*_purchase_conditions(filters))
+            .group_by(category)
+            .order_by(func.sum(PurchaseItem.subtotal).desc())
+            .all()
+        )
+
+    groups = [
+        SpendGroup(
+            key=row.category,
+            total_spent=round(float(row.total), 2),
+            purchase_count=int(row.purchases),
+            item_count=int(row.items),
+            average_purchase=round(float(row.total) / row.purchases, 2) if row.purchases else 0.0,
+        )
+        for row in rows
+    ]
+    return SpendBreakdown(group_by="category", groups=groups)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from app.core.database import get_db
+from app.core.cache import reference_cache
+from app.core.database import db_handler, get_db
+from app.core.etag import collection_response
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 
@@ -9,11 +11,19 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
-    return db.query(Category).order_by(Category.name).all()
+@db_handler
+def get_categories(request: Request, db: Session = Depends(get_db)):
+    return collection_response(
+        request, "categories",
+        lambda: [
+            CategoryResponse.model_validate(row)
+            for row in db.query(Category).order_by(Category.name).all()
+        ],
+    )
 
 
 @router.post("/", response_model=CategoryResponse)
+@db_handler
 def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     """Get-or-Create: return existing category if name matches, else create."""
     existing = (
@@ -27,11 +37,13 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     db_category = Category(name=category.name)
     db.add(db_category)
     db.commit()
+    reference_cache.invalidate("categories")
     db.refresh(db_category)
     return db_category
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
+@db_handler
 def update_category(category_id: int, category: CategoryUpdate, db: Session = Depends(get_db)):
     db_category = db.query(Category).filter(Category.id == category_id).first()
     if not db_category:
@@ -43,6 +55,7 @@ def update_category(category_id: int, category: CategoryUpdate, db: Session = De
 
     try:
         db.commit()
+        reference_cache.invalidate("categories")
         db.refresh(db_category)
     except IntegrityError:
         db.rollback()
@@ -52,10 +65,12 @@ def update_category(category_id: int, category: CategoryUpdate, db: Session = De
 
 
 @router.delete("/{category_id}")
+@db_handler
 def delete_category(category_id: int, db: Session = Depends(get_db)):
     db_category = db.query(Category).filter(Category.id == category_id).first()
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
     db.delete(db_category)
     db.commit()
+    reference_cache.invalidate("categories")
     return {"detail": "Category deleted"}
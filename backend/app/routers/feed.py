@@ -0,0 +1,23 @@
+"""
+Incremental change feed for the Power BI dataset (see app.services.change_feed).
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import db_handler, get_db
+from app.services import change_feed
+
+router = APIRouter()
+
+
+@router.get("/changes")
+@db_handler
+def get_changes(since: int | None = Query(None, ge=0), db: Session = Depends(get_db)):
+    """
+    Rows created/updated and ids deleted since version `since`, column-wise per table.
+
+    Omit `since` for a full snapshot. Pass the returned `watermark` as `since`
+    on the next call.
+    """
+    return change_feed.changes_since(db, since)
@@ -1,19 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from app.core.database import get_db
+from app.core.cache import reference_cache
+from app.core.database import db_handler, get_db
+from app.core.etag import cached_collection, collection_response
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.services import spend_rollup
+from app.services.product_search import ProductSearchIndex
 
 router = APIRouter()
 
 
+def _load_products(db: Session) -> list[ProductResponse]:
+    return [ProductResponse.model_validate(row) for row in db.query(Product).all()]
+
+
 @router.get("/", response_model=list[ProductResponse])
-def get_products(db: Session = Depends(get_db)):
-    return db.query(Product).all()
+@db_handler
+def get_products(request: Request, db: Session = Depends(get_db)):
+    return collection_response(request, "products", lambda: _load_products(db))
+
+
+@router.get("/search", response_model=list[ProductResponse])
+@db_handler
+def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Ranked matches for `q` over name, reference and category, from an
+    in-process index that product writes invalidate.
+    """
+    index = reference_cache.get_or_load(
+        ("products", "search_index"),
+        lambda: ProductSearchIndex(cached_collection("products", lambda: _load_products(db))[1]),
+    )
+    return index.search(q, limit)
 
 
 @router.post("/", response_model=ProductResponse)
+@db_handler
 def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     db_product = Product(
         name=product.name,
@@ -23,22 +51,34 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     )
     db.add(db_product)
     db.commit()
+    reference_cache.invalidate("products")
     db.refresh(db_product)
     return db_product
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
+@db_handler
 def update_product(product_id: int, product: ProductUpdate, db: Session = Depends(get_db)):
     db_product = db.query(Product).filter(Product.id == product_id).first()
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     update_data = product.model_dump(exclude_unset=True)
+    recategorised = (
+        "category" in update_data and update_data["category"] != db_product.category
+    )
+    # Its line items move from the old category's rollup rows to the new one's
+    if recategorised:
+        spend_rollup.subtract_spend(db, spend_rollup.with_products([product_id]))
     for field, value in update_data.items():
         setattr(db_product, field, value)
 
     try:
+        if recategorised:
+            db.flush()
+            spend_rollup.add_spend(db, spend_rollup.with_products([product_id]))
         db.commit()
+        reference_cache.invalidate("products")
         db.refresh(db_product)
     except IntegrityError:
         db.rollback()
@@ -48,10 +88,12 @@ def update_product(product_id: int, product: ProductUpdate, db: Session = Depend
 
 
 @router.delete("/{product_id}")
+@db_handler
 def delete_product(product_id: int, db: Session = Depends(get_db)):
     db_product = db.query(Product).filter(Product.id == product_id).first()
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
     db.delete(db_product)
     db.commit()
+    reference_cache.invalidate("products")
     return {"detail": "Product deleted"}
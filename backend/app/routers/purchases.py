@@ -1,140 +1,776 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
+import base64
+import binascii
+import csv
+import io
+import json
+from datetime import date as date_type, datetime, time
+from decimal import Decimal
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal, SessionRunner, db_handler, get_db, get_runner
+from app.core import formats
+from app.core.etag import make_etag, is_not_modified
+from app.core.responses import dumps
 from app.models.purchase import Purchase
 from app.models.purchase_item import PurchaseItem
 from app.models.user import User
 from app.models.shop import Shop
 from app.models.product import Product
-from app.schemas.purchase import PurchaseCreate, PurchaseUpdate, PurchaseResponse
+from app.services import collection_versions, spend_rollup
+from app.schemas.purchase import (
+    PurchaseItemCreate,
+    PurchaseItemUpdate,
+    PurchaseCreate,
+    PurchaseUpdate,
+    PurchaseResponse,
+    PurchasePage,
+    BulkPurchaseResult,
+    BulkPurchaseReport,
+)
 
 router = APIRouter()
 
-@router.get("/", response_model=list[PurchaseResponse])
-def get_purchases(db: Session = Depends(get_db)):
-    """Retrieve all purchases from the database."""
-    return db.query(Purchase).order_by(Purchase.date.desc()).all()
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+# ── Keyset cursor helpers ───────────────────────────────
+# The cursor is the (date, id) of the last row on the previous page,
+# base64-encoded so clients treat it as an opaque token.
+
+def _encode_cursor(purchase: Purchase) -> str:
+    raw = f"{purchase.date.isoformat()}|{purchase.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[date_type, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_part, id_part = raw.split("|")
+        return date_type.fromisoformat(date_part[:10]), int(id_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _load_purchase(db: Session, purchase_id: int) -> Purchase:
+    """Fetch a single purchase with its items in one batched round trip."""
+    return (
+        db.query(Purchase)
+        .options(selectinload(Purchase.items))
+        .filter(Purchase.id == purchase_id)
+        .populate_existing()  # Don't serve a stale identity-map copy
+        .one()
+    )
+
+
+# ── Reference lookups ───────────────────────────────────
+
+def _existing_ids(db: Session, model, ids: set[int]) -> set[int]:
+    """
+    Return the subset of `ids` that exist in `model`'s table, with one IN query.
+
+    Not answered from the reference cache: a row another worker deleted
+    within the cache TTL would pass here and then fail the foreign key at
+    flush with a 500 instead of a 404.
+    """
+    if not ids:
+        return set()
+    return set(db.scalars(select(model.id).where(model.id.in_(ids))))
+
+
+def _validate_products(db: Session, items: list[PurchaseItemCreate]) -> None:
+    """Check every referenced product at once and report all missing IDs."""
+    requested = {item.product_id for item in items}
+    if not requested:
+        return
+
+    found = _existing_ids(db, Product, requested)
+    missing = sorted(requested - found)
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Products not found: {', '.join(str(pid) for pid in missing)}",
+        )
+
+
+# ── Line-item helpers ───────────────────────────────────
+
+def _item_rows(purchase_id: int, items: list[PurchaseItemCreate]) -> list[dict]:
+    return [
+        {
+            "purchase_id": purchase_id,
+            "product_id": item.product_id,
+            "quantity": item.quantity,
+            "unit_price": item.price,
+            "subtotal": item.quantity * item.price,
+        }
+        for item in items
+    ]
+
+
+def _insert_items(db: Session, purchase_id: int, items: list[PurchaseItemCreate]) -> float:
+    """Insert all line items with one executemany and return the receipt total."""
+    rows = _item_rows(purchase_id, items)
+    if rows:
+        db.execute(insert(PurchaseItem), rows)
+    return sum(row["subtotal"] for row in rows)
+
+
+def _apply_item_diff(db: Session, purchase_id: int, items: list[PurchaseItemUpdate]) -> float:
+    """
+    Bring a purchase's line items in line with `items`, touching only what changed.
+
+    Incoming lines are matched to existing rows by `id` when given, otherwise
+    by `product_id`. Matched rows are updated only if quantity or price
+    differ, unmatched incoming lines are bulk-inserted and leftover rows are
+    deleted. An id listed twice is rejected with 400. Returns the receipt
+    total of the resulting set of lines.
+    """
+    existing = (
+        db.query(PurchaseItem)
+        .filter(PurchaseItem.purchase_id == purchase_id)
+        .all()
+    )
+    by_id = {row.id: row for row in existing}
+    unmatched_by_product: dict[int, list[PurchaseItem]] = {}
+    for row in existing:
+        unmatched_by_product.setdefault(row.product_id, []).append(row)
+
+    # Explicit ids claim their rows first so product matching can't steal them
+    claimed: set[int] = set()
+    for item in items:
+        if item.id is None:
+            continue
+        if item.id not in by_id:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Purchase item {item.id} not found in purchase {purchase_id}",
+            )
+        if item.id in claimed:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Purchase item {item.id} is listed more than once",
+            )
+        claimed.add(item.id)
+
+    to_insert: list[PurchaseItemCreate] = []
+    for item in items:
+        if item.id is not None:
+            row = by_id[item.id]
+        else:
+            candidates = [
+                r for r in unmatched_by_product.get(item.product_id, [])
+                if r.id not in claimed
+            ]
+            if not candidates:
+                to_insert.append(item)
+                continue
+            row = candidates[0]
+            claimed.add(row.id)
+
+        if (
+            row.product_id != item.product_id
+            or float(row.quantity) != item.quantity
+            or float(row.unit_price) != item.price
+        ):
+            row.product_id = item.product_id
+            row.quantity = item.quantity
+            row.unit_price = item.price
+            row.subtotal = item.quantity * item.price
+
+    # The total is summed over the rows the purchase ends up with
+    total = 0.0
+    for row in existing:
+        if row.id in claimed:
+            total += float(row.subtotal)
+        else:
+            db.delete(row)
+
+    total += _insert_items(db, purchase_id, to_insert)
+    return total
+
+
+# ── Page serialisation ──────────────────────────────────
+# The list endpoint selects plain column rows and builds the PurchasePage
+# JSON as dicts, encoded with orjson. Validating ORM instances through the
+# response model (from_attributes) cost more than the queries themselves.
+
+PAGE_COLUMNS = (Purchase.id, Purchase.user_id, Purchase.shop_id, Purchase.date, Purchase.total_amount)
+ITEM_COLUMNS = (
+    PurchaseItem.id, PurchaseItem.purchase_id, PurchaseItem.product_id,
+    PurchaseItem.quantity, PurchaseItem.unit_price, PurchaseItem.subtotal,
+)
+
+
+def _page_items(db: Session, rows) -> list[dict]:
+    """PurchaseResponse-shaped dicts for `rows`, with the items of the whole page in one query."""
+    items: dict[int, list[dict]] = {row.id: [] for row in rows}
+    if items:
+        for item_id, purchase_id, product_id, quantity, unit_price, subtotal in db.execute(
+            select(*ITEM_COLUMNS)
+            .where(PurchaseItem.purchase_id.in_(list(items)))
+            .order_by(PurchaseItem.id)
+        ).tuples():
+            items[purchase_id].append({
+                "id": item_id,
+                "product_id": product_id,
+                "quantity": float(quantity),
+                "unit_price": float(unit_price),
+                "subtotal": float(subtotal),
+            })
+    return [
+        {
+            "id": purchase_id,
+            "user_id": user_id,
+            "shop_id": shop_id,
+            # PurchaseResponse.date is a datetime: midnight of the purchase date
+            "date": datetime.combine(purchase_date, time()),
+            "total_amount": float(total_amount),
+            "items": items[purchase_id],
+        }
+        for purchase_id, user_id, shop_id, purchase_date, total_amount in rows
+    ]
+
+
+@router.get("/", response_model=PurchasePage)
+@db_handler
+def get_purchases(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    user_id: int | None = None,
+    shop_id: int | None = None,
+    date_from: date_type | None = None,
+    date_to: date_type | None = None,
+    min_total: float | None = None,
+    max_total: float | None = None,
+    db: Session = Depends(get_db),
+):
+    """Retrieve one page of purchases, newest first, keyset-paginated on (date, id)."""
+    query = db.query(Purchase)
+
+    if user_id is not None:
+        query = query.filter(Purchase.user_id == user_id)
+    if shop_id is not None:
+        query = query.filter(Purchase.shop_id == shop_id)
+    if date_from is not None:
+        query = query.filter(Purchase.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Purchase.date <= date_to)
+    if min_total is not None:
+        query = query.filter(Purchase.total_amount >= min_total)
+    if max_total is not None:
+        query = query.filter(Purchase.total_amount <= max_total)
+
+    if cursor is not None:
+        last_date, last_id = _decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                Purchase.date < last_date,
+                and_(Purchase.date == last_date, Purchase.id < last_id),
+            )
+        )
+
+    # Tag from the collection's write version: one primary-key lookup, read
+    # in the same transaction (snapshot) as the page rows below.
+    version = collection_versions.current(db, "purchases")
+    media_type = formats.negotiate(request)
+    etag = formats.variant_etag(make_etag("purchases", str(request.query_params), version), media_type)
+    headers = formats.negotiated_headers(etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    # Fetch one extra row to know whether another page exists
+    rows = (
+        query.with_entities(*PAGE_COLUMNS)
+        .order_by(Purchase.date.desc(), Purchase.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1])
+
+    page = _page_items(db, rows)
+    if media_type == formats.ARROW:
+        # One row per purchase with its items as a list<struct> column; the
+        # cursor, which has no place in a table, travels in a header.
+        body = formats.arrow_table_bytes({
+            "id": [row.id for row in rows],
+            "user_id": [row.user_id for row in rows],
+            "shop_id": [row.shop_id for row in rows],
+            "date": [row.date for row in rows],
+            "total_amount": [purchase["total_amount"] for purchase in page],
+            "items": [purchase["items"] for purchase in page],
+        })
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+    elif media_type == formats.MSGPACK:
+        body = formats.packb({"items": page, "next_cursor": next_cursor})
+    else:
+        body = dumps({"items": page, "next_cursor": next_cursor})
+    return Response(content=body, media_type=media_type, headers=headers)
 
 
 @router.delete("/{purchase_id}")
+@db_handler
 def delete_purchase(purchase_id: int, db: Session = Depends(get_db)):
     """Delete a purchase and its items (cascade)."""
     purchase = db.query(Purchase).filter(Purchase.id == purchase_id).first()
     if not purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
+    spend_rollup.subtract_spend(db, Purchase.id == purchase_id)
     db.delete(purchase)
     db.commit()
     return {"detail": "Purchase deleted"}
 
 
 @router.put("/{purchase_id}", response_model=PurchaseResponse)
+@db_handler
 def update_purchase(purchase_id: int, payload: PurchaseUpdate, db: Session = Depends(get_db)):
-    """Update a purchase header and replace all its line items."""
+    """Update a purchase header and sync its line items to the submitted list."""
     db_purchase = db.query(Purchase).filter(Purchase.id == purchase_id).first()
     if not db_purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
+    # Its spend leaves the rollup here and comes back, as edited, below
+    spend_rollup.subtract_spend(db, Purchase.id == purchase_id)
 
     # ── Update header fields ────────────────────────────
     if payload.user_id is not None:
-        user = db.query(User).filter(User.id == payload.user_id).first()
-        if not user:
+        if not _existing_ids(db, User, {payload.user_id}):
             raise HTTPException(status_code=404, detail="User not found")
         db_purchase.user_id = payload.user_id
 
     if payload.shop_id is not None:
-        shop = db.query(Shop).filter(Shop.id == payload.shop_id).first()
-        if not shop:
+        if not _existing_ids(db, Shop, {payload.shop_id}):
             raise HTTPException(status_code=404, detail="Shop not found")
         db_purchase.shop_id = payload.shop_id
 
     if payload.date is not None:
         db_purchase.date = payload.date
 
-    # ── Replace line items (delete old → insert new) ────
+    # ── Sync line items (insert / update / delete only what changed) ────
     if payload.items is not None:
-        # Delete all existing items
-        db.query(PurchaseItem).filter(
-            PurchaseItem.purchase_id == purchase_id
-        ).delete(synchronize_session="fetch")
-
-        total_receipt_amount = 0
-        for item in payload.items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if not product:
-                db.rollback()
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Product {item.product_id} not found",
-                )
-
-            calc_subtotal = item.quantity * item.price
-            total_receipt_amount += calc_subtotal
+        _validate_products(db, payload.items)
+        db_purchase.total_amount = _apply_item_diff(db, purchase_id, payload.items)
 
-            db_item = PurchaseItem(
-                purchase_id=purchase_id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                unit_price=item.price,
-                subtotal=calc_subtotal,
-            )
-            db.add(db_item)
+    # Always bump updated_at, even for item-only edits, so list ETags change
+    db_purchase.updated_at = func.now()
 
-        db_purchase.total_amount = total_receipt_amount
+    # ── Keep the monthly rollup in step (same transaction) ────
+    db.flush()
+    spend_rollup.add_spend(db, Purchase.id == purchase_id)
 
     db.commit()
-    db.refresh(db_purchase)
-    return db_purchase
+    return _load_purchase(db, purchase_id)
 
 @router.post("/", response_model=PurchaseResponse)
+@db_handler
 def create_purchase(purchase: PurchaseCreate, db: Session = Depends(get_db)):
     """Create a new purchase with multiple items (Atomic Transaction)."""
     
     # 1. Validation
-    user = db.query(User).filter(User.id == purchase.user_id).first()
-    if not user:
+    if not _existing_ids(db, User, {purchase.user_id}):
         raise HTTPException(status_code=404, detail="User not found")
 
-    shop = db.query(Shop).filter(Shop.id == purchase.shop_id).first()
-    if not shop:
+    if not _existing_ids(db, Shop, {purchase.shop_id}):
         raise HTTPException(status_code=404, detail="Shop not found")
 
+    _validate_products(db, purchase.items)
+
     # 2. Create the Purchase Header
     db_purchase = Purchase(
         user_id=purchase.user_id,
         shop_id=purchase.shop_id,
-        date=purchase.date if hasattr(purchase, 'date') and purchase.date else datetime.utcnow()
+        date=purchase.date if hasattr(purchase, 'date') and purchase.date else datetime.utcnow().date()
     )
     
     db.add(db_purchase)
     db.flush() # Secure the ID for child items
 
-    # 3. Create the Purchase Items & Calculate Totals
-    total_receipt_amount = 0
-    for item in purchase.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            db.rollback()
-            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-
-        calc_subtotal = item.quantity * item.price
-        total_receipt_amount += calc_subtotal
-
-        db_item = PurchaseItem(
-            purchase_id=db_purchase.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            unit_price=item.price,
-            subtotal=calc_subtotal
-        )
-        db.add(db_item)
+    # 3. Create the Purchase Items & Calculate Totals (single bulk INSERT)
+    total_receipt_amount = _insert_items(db, db_purchase.id, purchase.items)
 
     # 4. Update total amount in the header
     db_purchase.total_amount = total_receipt_amount
+    db.flush()
+    purchase_id = db_purchase.id  # Read before commit expires the instance
+    spend_rollup.add_spend(db, Purchase.id == purchase_id)
 
     # 5. Final Commit
     db.commit()
-    db.refresh(db_purchase)
 
-    return db_purchase
\ No newline at end of file
+    return _load_purchase(db, purchase_id)
+
+
+# ── Bulk ingestion ──────────────────────────────────────
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson")
+
+
+def _parse_ndjson_line(line: bytes) -> object:
+    """Decode one NDJSON record; a decode error is returned, not raised, so it lands in the report."""
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return ValueError(f"Invalid JSON: {exc}")
+
+
+def _ingest_chunk(db: Session, chunk: list[tuple[int, object]]) -> list[BulkPurchaseResult]:
+    """
+    Validate and insert one chunk of raw purchase records in a single transaction.
+
+    Users, shops and products are checked for the whole chunk at once, against
+    the reference cache plus one IN query per table for IDs it doesn't know. Records that fail validation are reported individually and never
+    block the rest of the chunk.
+    """
+    results: dict[int, BulkPurchaseResult] = {}
+    parsed: list[tuple[int, PurchaseCreate]] = []
+
+    for index, raw in chunk:
+        if isinstance(raw, Exception):
+            results[index] = BulkPurchaseResult(index=index, status="error", error=str(raw))
+            continue
+        try:
+            parsed.append((index, PurchaseCreate.model_validate(raw)))
+        except ValidationError as exc:
+            error = "; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+                for err in exc.errors()
+            )
+            results[index] = BulkPurchaseResult(index=index, status="error", error=error)
+
+    user_ids = {p.user_id for _, p in parsed}
+    shop_ids = {p.shop_id for _, p in parsed}
+    product_ids = {item.product_id for _, p in parsed for item in p.items}
+
+    known_users = _existing_ids(db, User, user_ids)
+    known_shops = _existing_ids(db, Shop, shop_ids)
+    known_products = _existing_ids(db, Product, product_ids)
+
+    accepted: list[tuple[int, PurchaseCreate, Purchase]] = []
+    for index, payload in parsed:
+        if payload.user_id not in known_users:
+            error = "User not found"
+        elif payload.shop_id not in known_shops:
+            error = "Shop not found"
+        else:
+            missing = sorted({item.product_id for item in payload.items} - known_products)
+            error = (
+                f"Products not found: {', '.join(str(pid) for pid in missing)}"
+                if missing else None
+            )
+        if error:
+            results[index] = BulkPurchaseResult(index=index, status="error", error=error)
+            continue
+
+        db_purchase = Purchase(
+            user_id=payload.user_id,
+            shop_id=payload.shop_id,
+            date=payload.date or datetime.utcnow().date(),
+            total_amount=sum(item.quantity * item.price for item in payload.items),
+        )
+        accepted.append((index, payload, db_purchase))
+
+    if accepted:
+        try:
+            db.add_all([db_purchase for _, _, db_purchase in accepted])
+            db.flush()  # Secure header IDs for the child rows
+            # Read before commit expires the instances (one SELECT each otherwise)
+            purchase_ids = [db_purchase.id for _, _, db_purchase in accepted]
+
+            rows = [
+                row
+                for (_, payload, _), purchase_id in zip(accepted, purchase_ids)
+                for row in _item_rows(purchase_id, payload.items)
+            ]
+            if rows:
+                db.execute(insert(PurchaseItem), rows)
+            spend_rollup.add_spend(db, Purchase.id.in_(purchase_ids))
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            for index, _, _ in accepted:
+                results[index] = BulkPurchaseResult(
+                    index=index, status="error", error=f"Database error: {exc.__class__.__name__}"
+                )
+        else:
+            for (index, _, _), purchase_id in zip(accepted, purchase_ids):
+                results[index] = BulkPurchaseResult(
+                    index=index, status="created", purchase_id=purchase_id
+                )
+
+    return [results[index] for index, _ in chunk]
+
+
+@router.post("/bulk", response_model=BulkPurchaseReport)
+async def bulk_create_purchases(
+    request: Request,
+    chunk_size: int | None = Query(None, ge=1, le=10000),
+    db: SessionRunner = Depends(get_runner),
+):
+    """
+    Ingest many purchases at once.
+
+    The body is either a JSON array of purchase payloads or an NDJSON stream
+    (`Content-Type: application/x-ndjson`, one payload per line). Records are
+    committed in chunks of `chunk_size` (default `BULK_CHUNK_SIZE`), so a bad
+    record or chunk never rolls back work that was already committed.
+    """
+    chunk_size = chunk_size or get_settings().BULK_CHUNK_SIZE
+    results: list[BulkPurchaseResult] = []
+    chunk: list[tuple[int, object]] = []
+
+    async def flush_chunk():
+        results.extend(await db.run(_ingest_chunk, chunk.copy()))
+        chunk.clear()
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        # Parse line by line as the body arrives; memory stays bounded by chunk_size
+        index = 0
+        buffer = b""
+        async for piece in request.stream():
+            buffer += piece
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                chunk.append((index, _parse_ndjson_line(line)))
+                index += 1
+                if len(chunk) >= chunk_size:
+                    await flush_chunk()
+        if buffer.strip():
+            chunk.append((index, _parse_ndjson_line(buffer)))
+    else:
+        try:
+            records = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+
+        for index, raw in enumerate(records):
+            chunk.append((index, raw))
+            if len(chunk) >= chunk_size:
+                await flush_chunk()
+
+    if chunk:
+        await flush_chunk()
+
+    created = sum(1 for result in results if result.status == "created")
+    return BulkPurchaseReport(created=created, failed=len(results) - created, results=results)
+
+
+# ── Streaming export ────────────────────────────────────
+
+EXPORT_COLUMNS = [
+    "purchase_id", "date", "user_id", "user_name", "shop_id", "shop_name",
+    "total_amount", "item_id", "product_id", "product_reference",
+    "product_name", "category", "quantity", "unit_price", "subtotal",
+]
+EXPORT_BATCH_ROWS = 1000
+
+
+def _export_statement(filters: dict):
+    """One flat row per line item, ordered so each purchase's rows are contiguous."""
+    stmt = (
+        select(
+            Purchase.id.label("purchase_id"),
+            Purchase.date,
+            Purchase.user_id,
+            User.name.label("user_name"),
+            Purchase.shop_id,
+            Shop.name.label("shop_name"),
+            Purchase.total_amount,
+            PurchaseItem.id.label("item_id"),
+            PurchaseItem.product_id,
+            Product.reference.label("product_reference"),
+            Product.name.label("product_name"),
+            Product.category,
+            PurchaseItem.quantity,
+            PurchaseItem.unit_price,
+            PurchaseItem.subtotal,
+        )
+        .join(User, Purchase.user_id == User.id)
+        .join(Shop, Purchase.shop_id == Shop.id)
+        .outerjoin(PurchaseItem, PurchaseItem.purchase_id == Purchase.id)
+        .outerjoin(Product, PurchaseItem.product_id == Product.id)
+        .order_by(Purchase.date, Purchase.id, PurchaseItem.id)
+    )
+    if filters["date_from"] is not None:
+        stmt = stmt.where(Purchase.date >= filters["date_from"])
+    if filters["date_to"] is not None:
+        stmt = stmt.where(Purchase.date <= filters["date_to"])
+    if filters["user_id"] is not None:
+        stmt = stmt.where(Purchase.user_id == filters["user_id"])
+    if filters["shop_id"] is not None:
+        stmt = stmt.where(Purchase.shop_id == filters["shop_id"])
+    return stmt
+
+
+def _stream_rows(filters: dict):
+    """
+    Yield export rows from a server-side cursor, `EXPORT_BATCH_ROWS` at a time.
+
+    Opens its own session because the response body is produced after the
+    request's dependencies have been torn down. It is always a sync
+    `SessionLocal` session, also when `DB_ASYNC` is on: `StreamingResponse`
+    pulls this generator from the threadpool, where only the sync engine can
+    hold a cursor open between batches. The export bypasses `db_handler` and
+    `SessionRunner`, and uses the sync engine's pool.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _export_statement(filters).execution_options(yield_per=EXPORT_BATCH_ROWS)
+        )
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date_type, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _export_csv(filters: dict):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for partition in _stream_rows(filters):
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _export_records(filters: dict):
+    """
+    Lists of purchase dicts with their items nested, one list per partition
+    of flat rows. A purchase split across partitions is held back until its
+    last row has been read.
+    """
+    current = None
+    records: list[dict] = []
+    for partition in _stream_rows(filters):
+        for row in partition:
+            if current is None or current["id"] != row.purchase_id:
+                if current is not None:
+                    records.append(current)
+                current = {
+                    "id": row.purchase_id,
+                    "date": _json_value(row.date),
+                    "user_id": row.user_id,
+                    "user_name": row.user_name,
+                    "shop_id": row.shop_id,
+                    "shop_name": row.shop_name,
+                    "total_amount": _json_value(row.total_amount),
+                    "items": [],
+                }
+            if row.item_id is not None:
+                current["items"].append({
+                    "id": row.item_id,
+                    "product_id": row.product_id,
+                    "product_reference": row.product_reference,
+                    "product_name": row.product_name,
+                    "category": row.category,
+                    "quantity": _json_value(row.quantity),
+                    "unit_price": _json_value(row.unit_price),
+                    "subtotal": _json_value(row.subtotal),
+                })
+        if records:
+            yield records
+            records = []
+    if current is not None:
+        yield [current]
+
+
+def _export_ndjson(filters: dict):
+    """One JSON object per purchase with its items nested, built from the flat rows."""
+    for records in _export_records(filters):
+        yield "".join(json.dumps(record) + "\n" for record in records)
+
+
+def _export_msgpack(filters: dict):
+    """The NDJSON records as a stream of MessagePack maps (read with `msgpack.Unpacker`)."""
+    for records in _export_records(filters):
+        yield b"".join(formats.packb(record) for record in records)
+
+
+# Arrow types of EXPORT_COLUMNS, in order
+EXPORT_ARROW_TYPES = [
+    "int64", "date32", "int64", "string", "int64", "string",
+    "float64", "int64", "int64", "string",
+    "string", "string", "float64", "float64", "float64",
+]
+
+
+def _export_arrow(filters: dict):
+    """The CSV rows as an Arrow stream, one record batch per partition, built column by column."""
+    schema = formats.arrow_schema(list(zip(EXPORT_COLUMNS, EXPORT_ARROW_TYPES)))
+    batches = (formats.arrow_rows_batch(schema, partition) for partition in _stream_rows(filters))
+    yield from formats.arrow_stream(schema, batches)
+
+
+EXPORT_FORMATS = {
+    "csv": (_export_csv, "text/csv"),
+    "ndjson": (_export_ndjson, "application/x-ndjson"),
+    "msgpack": (_export_msgpack, formats.MSGPACK),
+    "arrow": (_export_arrow, formats.ARROW),
+}
+
+
+@router.get("/export")
+def export_purchases(
+    request: Request,
+    format: str | None = Query(None, pattern="^(csv|ndjson|msgpack|arrow)$"),
+    date_from: date_type | None = None,
+    date_to: date_type | None = None,
+    user_id: int | None = None,
+    shop_id: int | None = None,
+):
+    """
+    Stream purchases with their items (and user, shop and product names).
+
+    `csv` and `arrow` have one row per line item; `ndjson` and `msgpack` have
+    one purchase per record with nested items. Without `format`, an Accept
+    header asking for MessagePack or Arrow picks that format, and anything
+    else gets CSV. Rows are read through a server-side cursor and written as
+    they arrive, so memory use doesn't depend on the size of the export.
+    Rows always come from the sync engine (see `_stream_rows`).
+    """
+    if format is None:
+        format = {formats.MSGPACK: "msgpack", formats.ARROW: "arrow"}.get(formats.negotiate(request), "csv")
+    filters = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "user_id": user_id,
+        "shop_id": shop_id,
+    }
+    encode, media_type = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        encode(filters),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="purchases.{format}"',
+            "Vary": "Accept",
+        },
+    )
@@ -1,25 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from app.core.database import get_db
+from app.core.cache import reference_cache
+from app.core.database import db_handler, get_db
+from app.core.etag import collection_response
 from app.models.shop import Shop
 from app.schemas.shop import ShopCreate, ShopUpdate, ShopResponse
+from app.services import spend_rollup
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[ShopResponse])
-def get_shops(db: Session = Depends(get_db)):
-    return db.query(Shop).all()
+@db_handler
+def get_shops(request: Request, db: Session = Depends(get_db)):
+    return collection_response(
+        request, "shops",
+        lambda: [ShopResponse.model_validate(row) for row in db.query(Shop).all()],
+    )
 
 
 @router.post("/", response_model=ShopResponse)
+@db_handler
 def create_shop(shop: ShopCreate, db: Session = Depends(get_db)):
     db_shop = Shop(name=shop.name)
 
     try:
         db.add(db_shop)
         db.commit()
+        reference_cache.invalidate("shops")
         db.refresh(db_shop)
         return db_shop
 
@@ -32,6 +41,7 @@ def create_shop(shop: ShopCreate, db: Session = Depends(get_db)):
 
 
 @router.put("/{shop_id}", response_model=ShopResponse)
+@db_handler
 def update_shop(shop_id: int, shop: ShopUpdate, db: Session = Depends(get_db)):
     db_shop = db.query(Shop).filter(Shop.id == shop_id).first()
     if not db_shop:
@@ -43,6 +53,7 @@ def update_shop(shop_id: int, shop: ShopUpdate, db: Session = Depends(get_db)):
 
     try:
         db.commit()
+        reference_cache.invalidate("shops")
         db.refresh(db_shop)
     except IntegrityError:
         db.rollback()
@@ -52,10 +63,14 @@ def update_shop(shop_id: int, shop: ShopUpdate, db: Session = Depends(get_db)):
 
 
 @router.delete("/{shop_id}")
+@db_handler
 def delete_shop(shop_id: int, db: Session = Depends(get_db)):
     db_shop = db.query(Shop).filter(Shop.id == shop_id).first()
     if not db_shop:
         raise HTTPException(status_code=404, detail="Shop not found")
+    # Their purchases go with them (cascade), so drop the derived rollup rows too
+    spend_rollup.drop_cells_for(db, shop_id=shop_id)
     db.delete(db_shop)
     db.commit()
+    reference_cache.invalidate("shops")
     return {"detail": "Shop deleted"}
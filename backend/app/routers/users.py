@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from app.core.database import get_db
+from app.core.cache import reference_cache
+from app.core.database import db_handler, get_db
+from app.core.etag import collection_response
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.services import spend_rollup
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[UserResponse])
-def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+@db_handler
+def get_users(request: Request, db: Session = Depends(get_db)):
+    return collection_response(
+        request, "users",
+        lambda: [UserResponse.model_validate(row) for row in db.query(User).all()],
+    )
 
 
 @router.post("/", response_model=UserResponse)
+@db_handler
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
     db_user = User(
         name=user.name,
@@ -24,6 +32,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
     try:
         db.commit()
+        reference_cache.invalidate("users")
         db.refresh(db_user)
     except IntegrityError:
         db.rollback()
@@ -33,6 +42,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.put("/{user_id}", response_model=UserResponse)
+@db_handler
 def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
@@ -44,6 +54,7 @@ def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
 
     try:
         db.commit()
+        reference_cache.invalidate("users")
         db.refresh(db_user)
     except IntegrityError:
         db.rollback()
@@ -53,11 +64,15 @@ def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
 
 
 @router.delete("/{user_id}")
+@db_handler
 def delete_user(user_id: int, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
+    # Their purchases go with them (cascade), so drop the derived rollup rows too
+    spend_rollup.drop_cells_for(db, user_id=user_id)
     db.delete(db_user)
     db.commit()
+    reference_cache.invalidate("users")
     return {"detail": "User deleted"}
 
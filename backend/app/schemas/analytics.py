@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class SpendSummary(BaseModel):
+    total_spent: float
+    purchase_count: int
+    item_count: int
+    average_purchase: float
+
+
+class SpendGroup(BaseModel):
+    key: str            # Period ("2026-02", "2026-W07"), shop/user id or category name
+    label: str | None = None  # Human-readable name for id-keyed groups
+    total_spent: float
+    purchase_count: int
+    item_count: int | None = None  # Only for item-level groupings (category)
+    average_purchase: float
+
+
+class SpendBreakdown(BaseModel):
+    group_by: str
+    groups: List[SpendGroup]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import List
+from datetime import date as date_type, datetime
+from typing import List, Literal
 
 # -------- Purchase Items --------
 
@@ -9,6 +9,9 @@ class PurchaseItemCreate(BaseModel):
     quantity: float
     price: float # We keep 'price' here because it's what the user types
 
+class PurchaseItemUpdate(PurchaseItemCreate):
+    id: int | None = None  # Existing line to edit; omit to match by product or add a new line
+
 class PurchaseItemResponse(BaseModel):
     id: int
     product_id: int
@@ -24,14 +27,14 @@ class PurchaseItemResponse(BaseModel):
 class PurchaseCreate(BaseModel):
     user_id: int
     shop_id: int
-    date: str | None = None
+    date: date_type | None = None  # "YYYY-MM-DD"; defaults to today
     items: List[PurchaseItemCreate]
 
 class PurchaseUpdate(BaseModel):
     user_id: int | None = None
     shop_id: int | None = None
-    date: str | None = None
-    items: List[PurchaseItemCreate] | None = None
+    date: date_type | None = None
+    items: List[PurchaseItemUpdate] | None = None
 
 class PurchaseResponse(BaseModel):
     id: int
@@ -42,4 +45,23 @@ class PurchaseResponse(BaseModel):
     items: List[PurchaseItemResponse]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class PurchasePage(BaseModel):
+    items: List[PurchaseResponse]
+    next_cursor: str | None = None  # Pass back as ?cursor= to fetch the next page
+
+
+# -------- Bulk ingestion --------
+
+class BulkPurchaseResult(BaseModel):
+    index: int  # Position of the record in the submitted array / NDJSON stream
+    status: Literal["created", "error"]
+    purchase_id: int | None = None
+    error: str | None = None
+
+class BulkPurchaseReport(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkPurchaseResult]
@@ -0,0 +1,178 @@
+"""
+Incremental change feed for BI refreshes (Power BI).
+
+Every committed write to a feed table is logged in `change_log` with the
+commit's version, a number from the "changes" sequence in
+app.services.collection_versions. The sequence is bumped as the last
+statement of the transaction and its row lock is held until the commit, so
+versions follow commit order: a reader that sees version N sees every commit
+up to N, and nothing committed later can get a version at or below N.
+
+A consumer keeps the last version it read (the watermark) and asks for
+everything logged after it:
+
+- current rows whose ids were logged after the watermark. Line items have no
+  entry of their own; they are sent for every purchase that was logged, and
+  every write to an item logs its purchase.
+- ids logged as deleted after the watermark, including the purchases and
+  items removed by ORM cascades.
+
+Both are read by `(table_name, version)` through the log's index rather than
+by timestamps on the tables. ORM writes are logged by a flush hook; Core
+`INSERT` / `UPDATE` / `DELETE` statements (the importers) call
+`record_changes`.
+
+Each table is returned column-wise (`{column: [values...]}`), which maps
+directly onto `Table.FromColumns` in Power Query and onto Arrow/pandas.
+"""
+
+from sqlalchemy import Select, event, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.change_log import ChangeLog
+from app.models.product import Product
+from app.models.purchase import Purchase
+from app.models.purchase_item import PurchaseItem
+from app.models.shop import Shop
+from app.models.user import User
+# Imported first so its commit hook (flush, then bump) runs before ours
+from app.services import collection_versions
+
+# Tables in the feed and the columns exported for each
+FEED_TABLES = {
+    "users": (User, ("id", "name", "email", "created_at", "updated_at")),
+    "shops": (Shop, ("id", "name", "created_at", "updated_at")),
+    "categories": (Category, ("id", "name", "created_at", "updated_at")),
+    "products": (
+        Product,
+        ("id", "reference", "name", "category", "unit_type", "created_at", "updated_at"),
+    ),
+    "purchases": (
+        Purchase,
+        ("id", "user_id", "shop_id", "date", "delivery_cost", "discount",
+         "total_amount", "created_at", "updated_at"),
+    ),
+    "purchase_items": (
+        PurchaseItem,
+        ("id", "purchase_id", "product_id", "quantity", "unit_price", "subtotal"),
+    ),
+}
+
+_TRACKED = {model: name for name, (model, _) in FEED_TABLES.items()}
+
+# Sequence in collection_versions that numbers the commits
+CHANGES = "changes"
+
+_PENDING = "change_feed.pending"
+
+
+# ── Logging writes ──────────────────────────────────────
+
+def _log(session: Session, table_name: str, record_ids, deleted: bool = False) -> None:
+    if not record_ids:
+        return
+    pending = session.info.setdefault(_PENDING, {})
+    for record_id in record_ids:
+        key = (table_name, int(record_id))
+        pending[key] = deleted or pending.get(key, False)
+    collection_versions.touch(session, CHANGES)
+
+
+def record_changes(db: Session, table_name: str, records, deleted: bool = False) -> None:
+    """
+    Log rows written with Core statements, which bypass the flush hook.
+
+    `records` is a list of ids or a SELECT of them, run straight away: log
+    deletions before the `DELETE`, inserts after the `INSERT`.
+    """
+    if isinstance(records, Select):
+        records = db.scalars(records).all()
+    _log(db, table_name, records, deleted)
+
+
+@event.listens_for(Session, "after_flush")
+def _log_flushed(session: Session, flush_context) -> None:
+    # new / dirty / deleted still hold what was just flushed, now with ids
+    changed = [(obj, False) for obj in session.new]
+    changed += [(obj, False) for obj in session.dirty if session.is_modified(obj)]
+    changed += [(obj, True) for obj in session.deleted]
+    for obj, deleted in changed:
+        name = _TRACKED.get(type(obj))
+        if name is None:
+            continue
+        if isinstance(obj, PurchaseItem):
+            # Items are sent with their purchase; only deletions are logged by id
+            _log(session, "purchases", [obj.purchase_id])
+            if not deleted:
+                continue
+        _log(session, name, [obj.id], deleted)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_log(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    # Bumped by collection_versions' hook, and locked by it until the commit
+    version = collection_versions.current(session, CHANGES)
+    session.execute(insert(ChangeLog), [
+        {"version": version, "table_name": table_name, "record_id": record_id, "deleted": deleted}
+        for (table_name, record_id), deleted in sorted(pending.items())
+    ])
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+# ── Feed ────────────────────────────────────────────────
+
+def _logged(table_name: str, since: int, watermark: int):
+    return select(ChangeLog.record_id).where(
+        ChangeLog.table_name == table_name,
+        ChangeLog.version > since,
+        ChangeLog.version <= watermark,
+    )
+
+
+def _columnar(rows, columns: tuple[str, ...]) -> dict[str, list]:
+    data = {column: [] for column in columns}
+    for row in rows:
+        for column, value in zip(columns, row):
+            data[column].append(value)
+    return data
+
+
+def changes_since(db: Session, since: int | None) -> dict:
+    """
+    Everything written or deleted by commits after version `since` (all
+    current rows and no deletions when `since` is None).
+    """
+    # Read first: rows committed after it are sent again by the next call
+    watermark = collection_versions.current(db, CHANGES)
+
+    tables = {}
+    for name, (model, columns) in FEED_TABLES.items():
+        query = select(*(getattr(model, column) for column in columns)).order_by(model.id)
+        if since is not None:
+            if model is PurchaseItem:
+                query = query.where(PurchaseItem.purchase_id.in_(_logged("purchases", since, watermark)))
+            else:
+                query = query.where(model.id.in_(_logged(name, since, watermark)))
+        tables[name] = _columnar(db.execute(query), columns)
+
+    deleted = {name: [] for name in FEED_TABLES}
+    if since is not None:
+        for name in FEED_TABLES:
+            query = _logged(name, since, watermark).where(ChangeLog.deleted.is_(True))
+            deleted[name] = sorted(set(db.scalars(query)))
+
+    return {
+        "since": since,
+        "watermark": watermark,
+        "full": since is None,
+        "tables": tables,
+        "deleted": deleted,
+    }
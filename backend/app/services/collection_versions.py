@@ -0,0 +1,92 @@
+"""
+Write versions of the collections served with ETags (`purchases` for now).
+
+A version is one row in `collection_versions`. Session hooks note which
+tables a transaction writes to, through ORM flushes and through Core
+`INSERT` / `UPDATE` / `DELETE` statements run on the session (the
+importers), and bump the version of each affected collection as the last
+statement before the commit. The bump holds the row lock until the commit,
+so versions are handed out in commit order. A reader that sees version N
+sees every write that produced a version up to N.
+
+The purchase list's ETag is built from the version, so answering a
+revalidation costs one primary-key lookup however many purchases there are.
+Writes made outside the app's sessions (e.g. SQL run by hand) don't bump
+it; clients then see the old tag until the next write.
+"""
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.collection_version import CollectionVersion
+
+# Tables whose writes change a collection, and the collection they change
+COLLECTIONS = {
+    "purchases": "purchases",
+    "purchase_items": "purchases",
+}
+
+_TOUCHED = "collection_versions.touched"
+
+
+def bump(db: Session, names: set[str]) -> None:
+    """Increment the versions of `names` (creating them at 1)."""
+    table = CollectionVersion.__table__
+    # Same lock order in every transaction
+    rows = [{"name": name, "version": 1} for name in sorted(names)]
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql_insert(table)
+        statement = statement.on_duplicate_key_update(version=table.c.version + 1)
+    else:
+        statement = sqlite_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["name"], set_={"version": table.c.version + 1},
+        )
+    db.execute(statement, rows)
+
+
+def current(db: Session, name: str) -> int:
+    """The committed version of a collection (0 until it is first written)."""
+    return db.scalar(select(CollectionVersion.version).where(CollectionVersion.name == name)) or 0
+
+
+# ── Session hooks ───────────────────────────────────────
+
+def touch(session: Session, collection: str) -> None:
+    """Bump `collection` when the session's transaction commits."""
+    session.info.setdefault(_TOUCHED, set()).add(collection)
+
+
+def _touch(session: Session, table_name: str) -> None:
+    collection = COLLECTIONS.get(table_name)
+    if collection is not None:
+        touch(session, collection)
+
+
+@event.listens_for(Session, "before_flush")
+def _flushed_tables(session: Session, flush_context, instances) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table is not None:
+            _touch(session, table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed_tables(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        _touch(state.session, state.statement.table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_touched(session: Session) -> None:
+    session.flush()  # Pending ORM changes register their tables first
+    touched = session.info.pop(_TOUCHED, None)
+    if touched:
+        bump(session, touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_touched(session: Session) -> None:
+    session.info.pop(_TOUCHED, None)
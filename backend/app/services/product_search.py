@@ -0,0 +1,135 @@
+"""
+In-process product search index for `GET /products/search`.
+
+The index is built from the whole catalogue and kept in `reference_cache`
+under the "products" namespace, so product writes drop it (through
+`reference_cache.invalidate("products")`) and the next search rebuilds it.
+Workers that did not handle the write pick the change up once the entry's
+TTL runs out, as with the cached product list.
+
+Text is folded to lowercase ASCII ("Crème" matches "creme") and split into
+words. A query matches a product when every query word is a prefix of one
+of its words or, from three characters, appears inside one. Everything is
+looked up per distinct word (a sorted word list for prefixes, trigram
+postings for substrings), so a search never scans the catalogue.
+"""
+
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+
+from app.schemas.product import ProductResponse
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Field weights: a hit in the name counts more than one in the category
+FIELDS = {"name": 3, "reference": 2, "category": 1}
+EXACT, PREFIX, SUBSTRING = 10, 6, 2
+# A full reference, or a name whose first word starts with the query
+REFERENCE_BONUS, NAME_START_BONUS = 100, 20
+
+
+def fold(text: str | None) -> str:
+    """Lowercase, accent-free form of `text` used for indexing and queries."""
+    if not text:
+        return ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return text.lower()
+
+
+def _trigrams(word: str) -> set[str]:
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _union(postings: dict[str, set[int]], words) -> set[int]:
+    result: set[int] = set()
+    for word in words:
+        result |= postings.get(word, set())
+    return result
+
+
+class ProductSearchIndex:
+    """Per-field word postings, plus prefix and trigram lookups over the distinct words."""
+
+    def __init__(self, products: list[ProductResponse]):
+        self.products = products
+        self.postings: dict[str, dict[str, set[int]]] = {field: defaultdict(set) for field in FIELDS}
+        self.name_starts: dict[str, set[int]] = defaultdict(set)
+        self.references: dict[str, set[int]] = defaultdict(set)
+
+        for position, product in enumerate(products):
+            for field in FIELDS:
+                text = fold(getattr(product, field))
+                words = _WORD.findall(text)
+                for word in words:
+                    self.postings[field][word].add(position)
+                if field == "name" and words:
+                    self.name_starts[words[0]].add(position)
+                elif field == "reference" and text:
+                    self.references[text.strip()].add(position)
+
+        words = set().union(*self.postings.values())
+        self.sorted_words = sorted(words)
+        self.trigrams: dict[str, set[str]] = defaultdict(set)
+        for word in words:
+            for trigram in _trigrams(word):
+                self.trigrams[trigram].add(word)
+
+        # Ties go to the shorter, then alphabetically first, name
+        by_name = sorted(range(len(products)), key=lambda p: (len(products[p].name), products[p].name))
+        self.order = [0] * len(products)
+        for rank, position in enumerate(by_name):
+            self.order[position] = rank
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def _prefixed(self, term: str) -> list[str]:
+        start = bisect.bisect_left(self.sorted_words, term)
+        end = bisect.bisect_left(self.sorted_words, term + "\x7f")
+        return self.sorted_words[start:end]
+
+    def _containing(self, term: str) -> list[str]:
+        candidates = None
+        for trigram in _trigrams(term):
+            words = self.trigrams.get(trigram, set())
+            candidates = words if candidates is None else candidates & words
+            if not candidates:
+                return []
+        return [word for word in candidates if term in word and not word.startswith(term)]
+
+    def search(self, query: str, limit: int) -> list[ProductResponse]:
+        """The `limit` best matches for `query`, best first."""
+        terms = list(dict.fromkeys(_WORD.findall(fold(query))))
+        if not terms:
+            return []
+
+        scores: dict[int, int] = defaultdict(int)
+        matches = None
+        for term in terms:
+            prefixed = self._prefixed(term)
+            containing = self._containing(term) if len(term) >= 3 else []
+            term_matches: set[int] = set()
+            for field, weight in FIELDS.items():
+                postings = self.postings[field]
+                exact = postings.get(term, set())
+                prefix = _union(postings, prefixed) - exact
+                substring = _union(postings, containing) - exact - prefix
+                for hits, points in ((exact, EXACT), (prefix, PREFIX), (substring, SUBSTRING)):
+                    for position in hits:
+                        scores[position] += points * weight
+                    term_matches |= hits
+            matches = term_matches if matches is None else matches & term_matches
+            if not matches:
+                return []
+
+        for position in self.references.get(" ".join(terms), set()):
+            scores[position] += REFERENCE_BONUS
+        for position in _union(self.name_starts, self._prefixed(terms[0])):
+            scores[position] += NAME_START_BONUS
+
+        best = heapq.nsmallest(limit, matches, key=lambda p: (-scores[p], self.order[p]))
+        return [self.products[position] for position in best]
@@ -0,0 +1,34 @@
+"""
+Create the tables the models declare, skipping those that already exist.
+
+    python -m app.services.schema
+
+MySQL databases are set up from `database/init.sql` and the dated scripts
+next to it; this is for fresh databases such as a local SQLite file. It
+never alters an existing table, so it does not replace those scripts.
+
+The API doesn't run it on import. Set `DB_CREATE_SCHEMA=True` to have the
+app's startup do it instead.
+"""
+
+from sqlalchemy import Engine, inspect
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.core.database import Base, get_engine
+
+
+def create_schema(engine: Engine | None = None) -> list[str]:
+    """Create missing tables; returns the names of the tables it created."""
+    engine = engine or get_engine()
+    with engine.begin() as connection:
+        existing = set(inspect(connection).get_table_names())
+        Base.metadata.create_all(bind=connection)
+    return [table for table in Base.metadata.tables if table not in existing]
+
+
+if __name__ == "__main__":
+    created = create_schema()
+    if created:
+        print(f"✅ Created {len(created)} tables: {', '.join(created)}")
+    else:
+        print("✅ Schema up to date; no tables created.")
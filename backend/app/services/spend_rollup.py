@@ -0,0 +1,173 @@
+"""
+Maintenance of the `monthly_spend` rollup table.
+
+Every write path moves the rollup by the spend of the purchases it touches,
+inside its own transaction. `subtract_spend` takes their line items out
+before the change and `add_spend` puts them back afterwards (new purchases
+only need the latter). Both apply their deltas with one upsert
+(`INSERT ... ON DUPLICATE KEY UPDATE` on MySQL, `ON CONFLICT DO UPDATE` on
+SQLite). The upsert adds to whatever the row holds when it is written, so
+concurrent writes to the same (user, shop, month) queue on the row lock and
+both land. Recomputing a cell from the transaction's snapshot instead would
+let the second writer overwrite the first with totals that miss its
+purchase under REPEATABLE READ.
+
+The purchases' items are read with a locking read (`FOR SHARE` on MySQL),
+which sees their latest committed state and keeps them from changing under
+the transaction. Rows whose item count drops to zero are deleted.
+
+Rebuild everything from scratch (e.g. after changing purchases directly in
+SQL) with:
+
+    python -m app.services.spend_rollup
+"""
+
+from datetime import date as date_type, datetime
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.monthly_spend import MonthlySpend
+from app.models.product import Product
+from app.models.purchase import Purchase
+from app.models.purchase_item import PurchaseItem
+
+UNCATEGORISED = "Uncategorised"
+
+CELL_COLUMNS = ("user_id", "shop_id", "category", "month")
+MEASURES = ("total_amount", "item_count", "receipt_count")
+
+
+def month_key(value: date_type | datetime | str) -> str:
+    """Return the "YYYY-MM" rollup month for a purchase date."""
+    if isinstance(value, str):
+        return value[:7]
+    return value.strftime("%Y-%m")
+
+
+def _aggregate_rows(db: Session, conditions: list, locking: bool = False) -> list[dict]:
+    category = func.coalesce(Product.category, UNCATEGORISED)
+    period = _month_expr(db)
+    query = (
+        db.query(
+            Purchase.user_id,
+            Purchase.shop_id,
+            category.label("category"),
+            period.label("month"),
+            func.sum(PurchaseItem.subtotal).label("total_amount"),
+            func.count(PurchaseItem.id).label("item_count"),
+            func.count(func.distinct(PurchaseItem.purchase_id)).label("receipt_count"),
+        )
+        .select_from(PurchaseItem)
+        .join(Purchase, PurchaseItem.purchase_id == Purchase.id)
+        .join(Product, PurchaseItem.product_id == Product.id)
+        .filter(*conditions)
+        .group_by(Purchase.user_id, Purchase.shop_id, category, period)
+    )
+    if locking:
+        query = query.with_for_update(read=True)  # Not rendered on SQLite, where writers are serialised
+    return [dict(row._mapping) for row in query.all()]
+
+
+def _month_expr(db: Session):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", Purchase.date)
+    return func.date_format(Purchase.date, "%Y-%m")
+
+
+def _apply(db: Session, rows: list[dict], sign: int) -> None:
+    if not rows:
+        return
+    # Same row order in every transaction, so two writers can't deadlock on it
+    rows = sorted(rows, key=lambda row: tuple(row[column] for column in CELL_COLUMNS))
+    for row in rows:
+        for measure in MEASURES:
+            row[measure] = sign * row[measure]
+
+    table = MonthlySpend.__table__
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql_insert(table)
+        statement = statement.on_duplicate_key_update(
+            {measure: table.c[measure] + statement.inserted[measure] for measure in MEASURES}
+        )
+    else:
+        statement = sqlite_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(CELL_COLUMNS),
+            set_={measure: table.c[measure] + statement.excluded[measure] for measure in MEASURES},
+        )
+    db.execute(statement, rows)
+
+    if sign < 0:
+        db.execute(delete(MonthlySpend).where(
+            MonthlySpend.item_count <= 0,
+            or_(*(
+                and_(*(getattr(MonthlySpend, column) == row[column] for column in CELL_COLUMNS))
+                for row in rows
+            )),
+        ))
+
+
+def add_spend(db: Session, purchases) -> None:
+    """
+    Add the line items of the purchases matching `purchases` (a condition on
+    `Purchase`, e.g. `Purchase.id.in_(ids)`) to the rollup.
+
+    Call it after the caller has flushed its purchase changes and before it
+    commits, so the rollup lands in the same transaction.
+    """
+    _apply(db, _aggregate_rows(db, [purchases], locking=True), 1)
+
+
+def subtract_spend(db: Session, purchases) -> None:
+    """Take the line items of the matching purchases out of the rollup; call before changing or deleting them."""
+    _apply(db, _aggregate_rows(db, [purchases], locking=True), -1)
+
+
+def with_products(product_ids: list[int]):
+    """The purchases with a line item for any of `product_ids` (whose spend moves on re-categorisation)."""
+    return Purchase.id.in_(
+        select(PurchaseItem.purchase_id).where(PurchaseItem.product_id.in_(product_ids))
+    )
+
+
+def drop_cells_for(db: Session, user_id: int | None = None, shop_id: int | None = None) -> None:
+    """Remove rollup rows for a user or shop whose purchases are being deleted."""
+    query = delete(MonthlySpend)
+    if user_id is not None:
+        query = query.where(MonthlySpend.user_id == user_id)
+    if shop_id is not None:
+        query = query.where(MonthlySpend.shop_id == shop_id)
+    db.execute(query)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute the whole rollup table. Returns the number of rows written."""
+    db.execute(delete(MonthlySpend))
+    rows = _aggregate_rows(db, [])
+    if rows:
+        db.execute(insert(MonthlySpend), rows)
+    db.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    from sqlalchemy import inspect
+
+    from app.core.config import get_settings
+    from app.core.database import SessionLocal, get_engine
+    from app.services.schema import create_schema
+
+    # The table comes from the dated migrations (or create_schema, as at app startup)
+    if get_settings().DB_CREATE_SCHEMA:
+        create_schema()
+    if not inspect(get_engine()).has_table(MonthlySpend.__tablename__):
+        raise SystemExit("❌ Table monthly_spend not found: apply database/18-10-26-monthly-spend.sql first.")
+    session = SessionLocal()
+    try:
+        count = rebuild(session)
+        print(f"✅ Rebuilt monthly_spend: {count} rows")
+    finally:
+        session.close()
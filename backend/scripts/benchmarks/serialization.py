@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Benchmark: serialising a page of purchases.
+
+Compares the previous path (ORM instances with selectinload, validated
+through PurchasePage with from_attributes, dumped and encoded with the
+stdlib json module as FastAPI's JSONResponse does) with the current one
+(column rows, plain dicts, orjson) on an in-memory SQLite database:
+
+    python scripts/benchmarks/serialization.py [--purchases 3000] [--items 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import selectinload, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.database import Base  # noqa: E402
+from app.core.responses import dumps  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.purchase import Purchase  # noqa: E402
+from app.models.purchase_item import PurchaseItem  # noqa: E402
+from app.models.shop import Shop  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.routers.purchases import PAGE_COLUMNS, _page_items  # noqa: E402
+from app.schemas.purchase import PurchasePage  # noqa: E402
+
+
+def seed(db, purchases: int, items: int) -> None:
+    random.seed(0)
+    db.add_all([User(name="bench", email="bench@example.com"), Shop(name="bench")])
+    db.flush()
+    db.execute(Product.__table__.insert(), [
+        {"name": f"Product {i}", "reference": f"R{i}", "category": "Bench", "unit_type": "unit"}
+        for i in range(200)
+    ])
+    db.execute(Purchase.__table__.insert(), [
+        {"user_id": 1, "shop_id": 1, "date": date(2024, 1, 1) + timedelta(days=i % 365),
+         "total_amount": round(random.uniform(5, 200), 2)}
+        for i in range(purchases)
+    ])
+    db.execute(PurchaseItem.__table__.insert(), [
+        {"purchase_id": p, "product_id": random.randint(1, 200), "quantity": 2,
+         "unit_price": 1.25, "subtotal": 2.5}
+        for p in range(1, purchases + 1) for _ in range(items)
+    ])
+    db.commit()
+
+
+def orm_path(db, limit: int) -> bytes:
+    rows = (
+        db.query(Purchase).options(selectinload(Purchase.items))
+        .order_by(Purchase.date.desc(), Purchase.id.desc()).limit(limit).all()
+    )
+    page = PurchasePage.model_validate({"items": rows, "next_cursor": None})
+    content = page.model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fast_path(db, limit: int) -> bytes:
+    rows = (
+        db.query(Purchase).with_entities(*PAGE_COLUMNS)
+        .order_by(Purchase.date.desc(), Purchase.id.desc()).limit(limit).all()
+    )
+    return dumps({"items": _page_items(db, rows), "next_cursor": None})
+
+
+def timed(fn, db, limit: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db.expunge_all()  # No identity-map reuse between runs
+        start = time.perf_counter()
+        fn(db, limit)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--purchases", type=int, default=3000)
+    parser.add_argument("--items", type=int, default=5, help="Items per purchase")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.purchases, args.items)
+
+    print(f"{'page size':>10} {'ORM + Pydantic':>16} {'rows + orjson':>15} {'speed-up':>9}")
+    for limit in (50, 500, args.purchases):
+        assert json.loads(orm_path(db, limit)) == json.loads(fast_path(db, limit))
+        slow = timed(orm_path, db, limit, args.repeat)
+        fast = timed(fast_path, db, limit, args.repeat)
+        print(f"{limit:>10} {slow * 1000:>13.1f} ms {fast * 1000:>12.1f} ms {slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
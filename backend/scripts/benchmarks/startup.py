@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Benchmark: importing and booting the API.
+
+Each run is a fresh interpreter that imports `app.main`, runs the lifespan
+startup and serves `GET /health`, timing the import and the boot separately.
+The default scenario points the app at a MySQL address where nothing listens,
+so any connection attempt during startup would fail the run; it also checks
+that no engine or database driver was loaded. The second scenario turns on
+`DB_CREATE_SCHEMA` against a fresh SQLite file, to show what that costs:
+
+    python scripts/benchmarks/startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD = """
+import json, sys, time
+
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+from app.core import database
+
+with TestClient(app.main.app) as client:
+    assert client.get("/health").status_code == 200
+booted = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - start,
+    "boot": booted - imported,
+    "engine": database.get_engine.cache_info().currsize > 0,
+    "driver": "pymysql" in sys.modules,
+}))
+"""
+
+SCENARIOS = {
+    "no database": {"DATABASE_URL": "mysql+pymysql://bench@127.0.0.1:9/unreachable"},
+    "DB_CREATE_SCHEMA (SQLite)": {"DB_CREATE_SCHEMA": "True"},
+}
+
+
+def run(env: dict[str, str]) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=BACKEND, env={**os.environ, **env}, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise SystemExit(f"❌ Startup failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<28} {'import':>10} {'boot':>10} {'engine built':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n, (name, env) in enumerate(SCENARIOS.items()):
+            results = []
+            for i in range(args.runs):
+                fresh_db = {"DATABASE_URL": f"sqlite:///{os.path.join(tmp, f'{n}-{i}.db')}"}
+                results.append(run({**fresh_db, **env}))
+            if name == "no database":
+                assert not any(r["engine"] or r["driver"] for r in results), "startup touched the database"
+            imported = statistics.median(r["import"] for r in results)
+            booted = statistics.median(r["boot"] for r in results)
+            built = "yes" if any(r["engine"] for r in results) else "no"
+            print(f"{name:<28} {imported * 1000:>7.0f} ms {booted * 1000:>7.0f} ms {built:>13}")
+
+
+if __name__ == "__main__":
+    main()
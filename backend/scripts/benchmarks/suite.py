@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+"""
+Benchmark suite: the API's hot paths and both Access importers, on a local
+SQLite file filled with synthetic data (see synthetic.py).
+
+    python scripts/benchmarks/suite.py [--purchases 200000] [--repeat 20]
+
+The dataset is generated on the first run and kept in `.benchmarks/`; every
+run works on a fresh copy, so the writes of one run never change the next.
+Each case reports its median and p95 time and the SQL statements it issued
+per call. Results are appended to `.benchmarks/history.jsonl` with the commit
+they were measured on and compared with the last run of another commit on the
+same dataset: a median slower by more than `--threshold`, or any extra
+statement, is flagged. `--fail-on-regression` then exits with status 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BACKEND, ".benchmarks")
+HISTORY = os.path.join(DATA_DIR, "history.jsonl")
+
+sys.path.insert(0, BACKEND)
+
+
+class QueryCounter:
+    """Counts statements sent to any engine while installed."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs) -> None:
+        self.count += 1
+
+
+def measure(call, repeat: int, counter: QueryCounter, setup=None) -> dict:
+    """Time `call(i)` `repeat` times (after one warm-up call), with its statement count."""
+    timings, queries = [], []
+    for i in range(-1, repeat):
+        if setup:
+            setup()
+        before = counter.count
+        start = time.perf_counter()
+        call(i)
+        elapsed = time.perf_counter() - start
+        if i >= 0:
+            timings.append(elapsed)
+            queries.append(counter.count - before)
+    return summarise(timings, queries)
+
+
+def summarise(timings: list[float], queries: list[int]) -> dict:
+    timings = sorted(timings)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        "queries": statistics.median(queries),
+    }
+
+
+def _ok(response, status: int = 200):
+    if response.status_code != status:
+        raise SystemExit(f"❌ {response.request.method} {response.request.url}: "
+                         f"{response.status_code} {response.text[:200]}")
+    return response
+
+
+# ── API cases ───────────────────────────────────────────
+
+def api_cases(client, db, rng, repeat: int, counter: QueryCounter) -> dict[str, dict]:
+    from sqlalchemy import func, select
+
+    from app.core.cache import reference_cache
+    from app.models.product import Product
+    from app.models.purchase import Purchase
+    from app.models.purchase_item import PurchaseItem
+    from app.models.shop import Shop
+    from app.models.user import User
+    from app.routers.purchases import _encode_cursor
+
+    users = db.scalar(select(func.count(User.id)))
+    shops = db.scalar(select(func.count(Shop.id)))
+    products = db.scalar(select(func.count(Product.id)))
+    last = db.scalar(select(func.max(Purchase.date)))
+    purchase_ids = db.scalars(select(Purchase.id)).all()
+    receipt_sizes = [1, 2, 3, 4, 4, 5, 7, 12, 25]
+
+    def receipt(size: int) -> list[dict]:
+        return [
+            {"product_id": int(rng.integers(1, products + 1)), "quantity": 1 + int(rng.integers(3)),
+             "price": round(float(rng.uniform(0.5, 30)), 2)}
+            for _ in range(size)
+        ]
+
+    creates = [
+        {"user_id": int(rng.integers(1, users + 1)), "shop_id": int(rng.integers(1, shops + 1)),
+         "date": str(last), "items": receipt(receipt_sizes[i % len(receipt_sizes)])}
+        for i in range(repeat + 1)
+    ]
+
+    # Typical edit: drop a line, change a quantity, add a product
+    updates = []
+    for purchase_id in rng.choice(purchase_ids, size=repeat + 1, replace=False):
+        lines = db.execute(
+            select(PurchaseItem.id, PurchaseItem.product_id, PurchaseItem.quantity, PurchaseItem.unit_price)
+            .where(PurchaseItem.purchase_id == int(purchase_id))
+        ).all()
+        items = [
+            {"id": line.id, "product_id": line.product_id, "quantity": float(line.quantity),
+             "price": float(line.unit_price)}
+            for line in lines[1:]
+        ]
+        if items:
+            items[0]["quantity"] += 1
+        updates.append((int(purchase_id), {"items": items + receipt(1)}))
+
+    middle = db.execute(
+        select(Purchase.id, Purchase.date).order_by(Purchase.date, Purchase.id)
+        .offset(len(purchase_ids) // 2).limit(1)
+    ).one()
+    window_end = last - timedelta(days=30)
+    user_window = {
+        "user_id": 1, "date_from": str(window_end - timedelta(days=90)), "date_to": str(window_end),
+    }
+    cases = {
+        "create_purchase": lambda i: _ok(client.post("/purchases/", json=creates[i])),
+        "update_purchase": lambda i: _ok(client.put(f"/purchases/{updates[i][0]}", json=updates[i][1])),
+        "get_purchases: first page": lambda i: _ok(client.get("/purchases/", params={"limit": 50})),
+        "get_purchases: user, 3 months": lambda i: _ok(client.get("/purchases/", params=user_window)),
+        "get_purchases: deep cursor": lambda i: _ok(client.get(
+            "/purchases/", params={"limit": 50, "cursor": _encode_cursor(middle)},
+        )),
+    }
+    results = {name: measure(call, repeat, counter) for name, call in cases.items()}
+    # Tagged after the writes above, which change the purchase ETag
+    tagged = _ok(client.get("/purchases/", params={"limit": 50})).headers["etag"]
+    results["get_purchases: 304"] = measure(
+        lambda i: _ok(client.get("/purchases/", params={"limit": 50}, headers={"If-None-Match": tagged}), 304),
+        repeat, counter,
+    )
+    results["list_products: cold cache"] = measure(
+        lambda i: _ok(client.get("/products/")), repeat, counter,
+        setup=lambda: reference_cache.invalidate("products"),
+    )
+    results["list_products: warm cache"] = measure(lambda i: _ok(client.get("/products/")), repeat, counter)
+    return results
+
+
+# ── Importer cases ──────────────────────────────────────
+
+def importer_cases(exports: str, workdir: str, repeat: int, counter: QueryCounter) -> dict[str, dict]:
+    """
+    Products, orders, then orders again unchanged (the nightly case), in row
+    and bulk mode; the sequence is repeated `repeat` times on a fresh database.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.importers.bulk import bulk_session_factory
+    from app.importers.orders import DETAILS_FILE, ORDERS_FILE, import_orders
+    from app.importers.pipeline import ImportRun
+    from app.importers.products import PRODUCTS_FILE, import_products
+    from app.models.shop import Shop
+    from app.models.user import User
+    from app.services.schema import create_schema
+
+    def products(run: ImportRun) -> None:
+        import_products(run, os.path.join(exports, PRODUCTS_FILE))
+
+    def orders(run: ImportRun) -> None:
+        import_orders(run, os.path.join(exports, ORDERS_FILE), os.path.join(exports, DETAILS_FILE), 1, 1)
+
+    sequence = [("import products", products), ("import orders", orders), ("import orders, unchanged rerun", orders)]
+    results = {}
+    for mode in ("rows", "bulk"):
+        samples: dict[str, list[tuple[float, int]]] = {name: [] for name, _ in sequence}
+        for attempt in range(repeat):
+            engine = create_engine(f"sqlite:///{os.path.join(workdir, f'import-{mode}-{attempt}.db')}")
+            create_schema(engine)
+            factory = bulk_session_factory(engine) if mode == "bulk" else sessionmaker(bind=engine)
+            with factory() as db, db.begin():
+                db.add_all([User(id=1, name="Import", email="import@example.com"), Shop(id=1, name="Import")])
+
+            for name, importer in sequence:
+                run = ImportRun(
+                    factory, checkpoint_path=os.path.join(workdir, f"checkpoint-{mode}.json"),
+                    chunk_size=50_000, bulk=mode == "bulk",
+                )
+                before = counter.count
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    importer(run)
+                    run.finish(True)
+                samples[name].append((time.perf_counter() - start, counter.count - before))
+            engine.dispose()
+
+        for name, runs in samples.items():
+            results[f"{name} ({mode})"] = summarise(
+                [elapsed for elapsed, _ in runs], [queries for _, queries in runs],
+            )
+    return results
+
+
+# ── History ─────────────────────────────────────────────
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=BACKEND, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _previous(record: dict, group: str) -> dict | None:
+    """
+    The latest earlier run of `group` on the same dataset and in the same
+    mode, preferring one from another commit.
+    """
+    if not os.path.exists(HISTORY):
+        return None
+    with open(HISTORY, encoding="utf-8") as fh:
+        runs = [json.loads(line) for line in fh if line.strip()]
+    comparable = [
+        run for run in runs
+        if run["mode"] == record["mode"]
+        and run["groups"].get(group, {}).get("dataset") == record["groups"][group]["dataset"]
+    ]
+    others = [run for run in comparable if run["commit"] != record["commit"]]
+    return (others or comparable or [None])[-1]
+
+
+def report(record: dict, group: str, threshold: float) -> int:
+    """Print a group's results next to the previous run's; returns the number of regressions."""
+    previous = _previous(record, group)
+    against = f"vs {previous['commit'][:8]}" if previous else ""
+    print(f"\n{group:<40} {'median':>10} {'p95':>10} {'queries':>8}  {against}")
+    earlier = previous["groups"][group]["results"] if previous else {}
+    regressions = 0
+    for name, result in record["groups"][group]["results"].items():
+        line = f"{name:<40} {result['median_ms']:>7.1f} ms {result['p95_ms']:>7.1f} ms {result['queries']:>8g}"
+        before = earlier.get(name)
+        if before:
+            change = result["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0.0
+            notes = [f"{change:+.0%}"]
+            # Sub-millisecond differences are noise on any machine
+            if change > threshold and result["median_ms"] - before["median_ms"] > 1:
+                notes.append("⚠️  slower")
+                regressions += 1
+            if result["queries"] > before["queries"]:
+                notes.append(f"⚠️  queries {before['queries']:g} → {result['queries']:g}")
+                regressions += 1
+            line += "  " + "  ".join(notes)
+        print(line)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--purchases", type=int, default=200_000, help="Purchases in the API dataset")
+    parser.add_argument("--orders", type=int, default=20_000, help="Orders in the importer exports")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per API case")
+    parser.add_argument("--import-repeat", type=int, default=3, help="Runs of each importer case")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="Serve the API in async mode")
+    parser.add_argument("--only", choices=["api", "importers"], help="Run one group of cases")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Slowdown flagged as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-history", action="store_true", help="Don't append this run to the history")
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix="smartspend-bench-")
+    work_db = os.path.join(workdir, "api.db")
+
+    # The app reads its settings on import, so point it at the working copy first
+    os.environ.update(DATABASE_URL=f"sqlite:///{work_db}", DB_ASYNC=str(args.async_mode))
+    if args.async_mode:
+        os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{work_db}"
+
+    import numpy as np
+    from fastapi.testclient import TestClient
+    from sqlalchemy import Engine, event
+
+    import synthetic
+    from app.core.database import SessionLocal
+    from app.main import app
+
+    counter = QueryCounter()
+    event.listen(Engine, "before_cursor_execute", counter)
+    groups: dict[str, dict] = {}
+    try:
+        if args.only != "importers":
+            dataset = os.path.join(DATA_DIR, f"api-{args.purchases}-{args.seed}.db")
+            if not os.path.exists(dataset):
+                print(f"⏳ Generating {args.purchases:,} purchases into {dataset} (once)...")
+                synthetic.seed_database(f"sqlite:///{dataset}.tmp", purchases=args.purchases, seed=args.seed)
+                os.replace(f"{dataset}.tmp", dataset)
+            shutil.copyfile(dataset, work_db)
+            with TestClient(app) as client, SessionLocal() as db:
+                groups["api"] = {
+                    "dataset": {"purchases": args.purchases, "seed": args.seed},
+                    "results": api_cases(client, db, np.random.default_rng(args.seed), args.repeat, counter),
+                }
+
+        if args.only != "api":
+            exports = os.path.join(DATA_DIR, f"exports-{args.orders}-{args.seed}")
+            if not os.path.exists(exports):
+                print(f"⏳ Writing Access exports with {args.orders:,} orders into {exports} (once)...")
+                synthetic.write_access_exports(f"{exports}.tmp", orders=args.orders, seed=args.seed)
+                os.replace(f"{exports}.tmp", exports)
+            groups["importers"] = {
+                "dataset": {"orders": args.orders, "seed": args.seed},
+                "results": importer_cases(exports, workdir, args.import_repeat, counter),
+            }
+    finally:
+        event.remove(Engine, "before_cursor_execute", counter)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    record = {
+        "commit": _git("rev-parse", "HEAD") or "unknown",
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "mode": "async" if args.async_mode else "sync",
+        "groups": groups,
+    }
+    regressions = sum(report(record, group, args.threshold) for group in groups)
+    if not args.no_history:
+        with open(HISTORY, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+    if regressions and args.fail_on_regression:
+        print(f"\n❌ {regressions} regressions.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
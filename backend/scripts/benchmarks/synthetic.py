@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+"""
+Synthetic SmartSpend data at realistic scale, for benchmarks.
+
+`database` fills a database with users, shops, categories, products with
+references, and purchases with their items; `exports` writes the three Access
+CSV files the importers read (`;` separated, cp1252, "12,50 €" prices):
+
+    python scripts/benchmarks/synthetic.py database bench.db --purchases 2000000
+    python scripts/benchmarks/synthetic.py exports raw/ --orders 100000
+
+The data is shaped like real shopping rather than uniform noise:
+
+- receipts mostly hold a handful of lines, with a long tail of big shops;
+- a few products (and users, and shops) account for most purchases;
+- purchases are spread over `--years` years ending on a fixed date, busier
+  on weekends and in December, and growing over time;
+- most products are sold by the unit, some by weight or volume, with
+  fractional quantities and prices that vary a little around a base price.
+
+The same `--seed` always produces the same data, so timings taken on
+different commits compare like with like.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.importers.bulk import _insert_batches  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.purchase import Purchase  # noqa: E402
+from app.models.purchase_item import PurchaseItem  # noqa: E402
+from app.models.shop import Shop  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import spend_rollup  # noqa: E402
+from app.services.schema import create_schema  # noqa: E402
+
+END_DATE = date(2026, 6, 30)
+# Rows handed to one multi-row INSERT pass; bounds the Python objects alive at once
+INSERT_SLICE_ROWS = 100_000
+
+CATEGORIES = [
+    "Alimentación", "Bebidas", "Lácteos", "Panadería", "Frutas y verduras",
+    "Carnicería", "Pescadería", "Congelados", "Limpieza", "Higiene",
+    "Cosmética", "Nutrilite", "Artistry", "Droguería", "Mascotas",
+    "Bebé", "Bazar", "Papelería", "Electrónica", "Jardín",
+]
+WORDS = [
+    "Crème", "Café", "Jabón", "Aceite", "Leche", "Pan", "Queso", "Yogur",
+    "Agua", "Zumo", "Galletas", "Arroz", "Pasta", "Tomate", "Champú",
+    "Detergente", "Vitamina", "Proteína", "Té", "Miel", "Cacao", "Atún",
+    "Pollo", "Jamón", "Limón", "Manzana", "Plátano", "Naranja", "Suavizante",
+]
+QUALIFIERS = [
+    "natural", "integral", "ecológico", "desnatada", "clásico", "suave",
+    "extra", "light", "familiar", "piña", "sin azúcar", "multiusos",
+]
+SIZES = ["250 g", "500 g", "1 kg", "1 L", "1,5 L", "6 x 1 L", "75 ml", "200 ml", "30 uds"]
+SHOP_NAMES = ["Mercadona", "Carrefour", "Lidl", "Aldi", "Dia", "Eroski", "Alcampo", "Consum", "Amway"]
+
+# Unit types with their share of the catalogue
+UNIT_TYPES = {"unit": 0.85, "kg": 0.09, "liter": 0.04, "g": 0.01, "ml": 0.01}
+
+
+def _popularity(rng: np.random.Generator, count: int, exponent: float) -> np.ndarray:
+    """Zipf-like probabilities over `count` items, in random order."""
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _catalogue(rng: np.random.Generator, products: int) -> pd.DataFrame:
+    """Products with references, names, categories, unit types and base prices."""
+    categories = rng.choice(len(CATEGORIES), size=products, p=_popularity(rng, len(CATEGORIES), 0.8))
+    names = [
+        f"{WORDS[w]} {QUALIFIERS[q]} {SIZES[s]} {i}"
+        for i, (w, q, s) in enumerate(zip(
+            rng.integers(len(WORDS), size=products),
+            rng.integers(len(QUALIFIERS), size=products),
+            rng.integers(len(SIZES), size=products),
+        ))
+    ]
+    return pd.DataFrame({
+        "reference": [f"{CATEGORIES[c][:2].upper()}{10000 + i}" for i, c in enumerate(categories)],
+        "name": names,
+        "category": [CATEGORIES[c] for c in categories],
+        "unit_type": rng.choice(list(UNIT_TYPES), size=products, p=list(UNIT_TYPES.values())),
+        "price": np.clip(rng.lognormal(np.log(4.5), 0.8, size=products), 0.2, 400).round(2),
+    })
+
+
+def _purchase_dates(rng: np.random.Generator, count: int, years: int) -> np.ndarray:
+    """Sorted purchase dates: weekend and December peaks on a growing trend."""
+    days = years * 365
+    start = END_DATE - timedelta(days=days - 1)
+    calendar = pd.date_range(start, END_DATE, freq="D")
+    weekday = np.array([0.8, 0.85, 0.9, 0.95, 1.2, 1.6, 0.7])[calendar.weekday]
+    month = np.where(calendar.month == 12, 1.5, 1.0)
+    trend = 1.0 + np.arange(len(calendar)) / len(calendar)
+    weights = weekday * month * trend
+    picked = np.sort(rng.choice(len(calendar), size=count, p=weights / weights.sum()))
+    return calendar.values[picked]
+
+
+def _receipts(rng: np.random.Generator, catalogue: pd.DataFrame, purchases: int, years: int):
+    """
+    Purchase headers and their lines as two frames.
+
+    Lines reference purchases and products by position (0-based); totals are
+    the sum of their lines' subtotals.
+    """
+    sizes = np.clip(1 + rng.negative_binomial(1.2, 0.3, size=purchases), 1, 80)
+    line_purchase = np.repeat(np.arange(purchases), sizes)
+    line_product = rng.choice(len(catalogue), size=len(line_purchase), p=_popularity(rng, len(catalogue), 1.05))
+
+    by_unit = catalogue["unit_type"].to_numpy()[line_product] == "unit"
+    whole = rng.choice([1, 2, 3, 4, 6], size=len(line_purchase), p=[0.7, 0.18, 0.06, 0.04, 0.02])
+    measured = np.clip(rng.lognormal(np.log(0.6), 0.6, size=len(line_purchase)), 0.05, 8).round(3)
+    quantity = np.where(by_unit, whole, measured)
+    unit_price = (
+        catalogue["price"].to_numpy()[line_product] * rng.normal(1.0, 0.05, size=len(line_purchase))
+    ).clip(0.05).round(2)
+    subtotal = (quantity * unit_price).round(2)
+
+    headers = pd.DataFrame({
+        "date": _purchase_dates(rng, purchases, years),
+        "total_amount": np.bincount(line_purchase, weights=subtotal, minlength=purchases).round(2),
+    })
+    lines = pd.DataFrame({
+        "purchase": line_purchase,
+        "product": line_product,
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "subtotal": subtotal,
+    })
+    return headers, lines
+
+
+# ── Database ────────────────────────────────────────────
+
+def _insert(db: Session, table, df: pd.DataFrame) -> None:
+    for start in range(0, len(df), INSERT_SLICE_ROWS):
+        _insert_batches(db, table, df.iloc[start:start + INSERT_SLICE_ROWS])
+
+
+def seed_database(
+    url: str,
+    purchases: int = 200_000,
+    users: int = 50,
+    shops: int = 40,
+    products: int = 5_000,
+    years: int = 3,
+    seed: int = 0,
+) -> dict[str, int]:
+    """Create the schema at `url` and fill it; returns the row count per table."""
+    rng = np.random.default_rng(seed)
+    engine = create_engine(url)
+    create_schema(engine)
+    catalogue = _catalogue(rng, products)
+    headers, lines = _receipts(rng, catalogue, purchases, years)
+
+    headers["id"] = np.arange(1, purchases + 1)
+    headers["user_id"] = 1 + rng.choice(users, size=purchases, p=_popularity(rng, users, 0.7))
+    headers["shop_id"] = 1 + rng.choice(shops, size=purchases, p=_popularity(rng, shops, 1.0))
+    headers["date"] = pd.to_datetime(headers["date"]).dt.date
+
+    with Session(engine) as db, db.begin():
+        _insert(db, User.__table__, pd.DataFrame({
+            "id": np.arange(1, users + 1),
+            "name": [f"Usuario {i}" for i in range(1, users + 1)],
+            "email": [f"user{i}@example.com" for i in range(1, users + 1)],
+        }))
+        _insert(db, Shop.__table__, pd.DataFrame({
+            "id": np.arange(1, shops + 1),
+            "name": [f"{SHOP_NAMES[i % len(SHOP_NAMES)]} {i + 1}" for i in range(shops)],
+        }))
+        _insert(db, Category.__table__, pd.DataFrame({"name": CATEGORIES}))
+        _insert(db, Product.__table__, catalogue.drop(columns="price").assign(id=np.arange(1, products + 1)))
+        _insert(db, Purchase.__table__, headers[["id", "user_id", "shop_id", "date", "total_amount"]])
+        _insert(db, PurchaseItem.__table__, pd.DataFrame({
+            "id": np.arange(1, len(lines) + 1),
+            "purchase_id": lines["purchase"] + 1,
+            "product_id": lines["product"] + 1,
+            "quantity": lines["quantity"],
+            "unit_price": lines["unit_price"],
+            "subtotal": lines["subtotal"],
+        }))
+    with Session(engine) as db:
+        rollup = spend_rollup.rebuild(db)
+    engine.dispose()
+
+    return {
+        "users": users, "shops": shops, "categories": len(CATEGORIES), "products": products,
+        "purchases": purchases, "purchase_items": len(lines), "monthly_spend": rollup,
+    }
+
+
+# ── Access exports ──────────────────────────────────────
+
+def _spanish(values: np.ndarray, decimals: int) -> pd.Series:
+    """12.5 → "12,50"."""
+    return pd.Series(values).map(f"{{:.{decimals}f}}".format).str.replace(".", ",", regex=False)
+
+
+def write_access_exports(
+    directory: str,
+    orders: int = 20_000,
+    products: int = 5_000,
+    years: int = 3,
+    seed: int = 0,
+) -> dict[str, int]:
+    """
+    Write `Productos.csv`, `Pedidos-cabecera.csv` and `Pedidos-detalles.csv`
+    into `directory`, with the oddities of the real export: blank lines in
+    the products file, a few products without a reference, and a few order
+    lines referring to products that are not in the products file.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    catalogue = _catalogue(rng, products)
+    headers, lines = _receipts(rng, catalogue, orders, years)
+    options = {"sep": ";", "encoding": "cp1252", "index": False, "lineterminator": "\r\n"}
+
+    references = catalogue["reference"].copy()
+    references[rng.random(products) < 0.002] = ""
+    exported = pd.DataFrame({
+        "Refencia": references,
+        "Descripcion": catalogue["name"],
+        "Marca": catalogue["category"],
+    })
+    blank = pd.DataFrame({"Refencia": [""] * max(1, products // 500), "Descripcion": "", "Marca": ""})
+    pd.concat([exported, blank]).to_csv(os.path.join(directory, "Productos.csv"), **options)
+
+    order_numbers = np.arange(100_000, 100_000 + orders)
+    pd.DataFrame({
+        "NUMERO DE PEDIDO": order_numbers,
+        "FECHA": pd.to_datetime(headers["date"]).dt.strftime("%d/%m/%Y"),
+        "TOTAL": _spanish(headers["total_amount"].to_numpy(), 2) + " €",
+        "PUNTOS": (headers["total_amount"] // 10).astype(int),
+    }).to_csv(os.path.join(directory, "Pedidos-cabecera.csv"), **options)
+
+    line_references = catalogue["reference"].to_numpy()[lines["product"]].astype(object)
+    unknown = rng.random(len(lines)) < 0.001
+    line_references[unknown] = [f"XX{n}" for n in rng.integers(1_000_000, size=int(unknown.sum()))]
+    pd.DataFrame({
+        "NUMERO DE PEDIDO": order_numbers[lines["purchase"]],
+        "REFERENCIA PRODUCTO": line_references,
+        "UNIDADES": _spanish(lines["quantity"].to_numpy(), 3).str.rstrip("0").str.rstrip(","),
+        "PRECIO": _spanish(lines["unit_price"].to_numpy(), 2),
+    }).to_csv(os.path.join(directory, "Pedidos-detalles.csv"), **options)
+
+    return {"products": products, "orders": orders, "order_lines": len(lines)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--seed", type=int, default=0)
+    common.add_argument("--years", type=int, default=3)
+    common.add_argument("--products", type=int, default=5_000)
+    targets = parser.add_subparsers(dest="target", required=True)
+
+    database = targets.add_parser(
+        "database", parents=[common], help="Fill a SQLite file (or --url) with synthetic data",
+    )
+    database.add_argument("path", nargs="?", help="SQLite file to create")
+    database.add_argument("--url", help="SQLAlchemy URL instead of a SQLite file")
+    database.add_argument("--purchases", type=int, default=200_000)
+    database.add_argument("--users", type=int, default=50)
+    database.add_argument("--shops", type=int, default=40)
+
+    exports = targets.add_parser("exports", parents=[common], help="Write synthetic Access CSV exports")
+    exports.add_argument("directory")
+    exports.add_argument("--orders", type=int, default=20_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.target == "database":
+        if not args.url and not args.path:
+            parser.error("give a SQLite file or --url")
+        if args.path and os.path.exists(args.path):
+            raise SystemExit(f"❌ {args.path} already exists.")
+        counts = seed_database(
+            args.url or f"sqlite:///{args.path}", purchases=args.purchases, users=args.users,
+            shops=args.shops, products=args.products, years=args.years, seed=args.seed,
+        )
+    else:
+        counts = write_access_exports(
+            args.directory, orders=args.orders, products=args.products, years=args.years, seed=args.seed,
+        )
+    summary = ", ".join(f"{count:,} {name}" for name, count in counts.items())
+    print(f"✅ {summary} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Shared fixtures. The app runs against a throwaway SQLite file whose tables
+are recreated for every test:
+
+    cd backend/
+    python -m pytest
+
+Set `DB_ASYNC=True` to run the same tests through the async session mode.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read when app.core.config is first imported
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="smartspend-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+os.environ["DB_CREATE_SCHEMA"] = "False"
+os.environ.setdefault("DB_ASYNC", "False")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import Engine, event, insert  # noqa: E402
+
+from app.core.cache import reference_cache  # noqa: E402
+from app.core.database import Base, SessionLocal, get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.purchase import Purchase  # noqa: E402
+from app.models.purchase_item import PurchaseItem  # noqa: E402
+from app.models.shop import Shop  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.schema import create_schema  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def schema():
+    """Empty tables (and an empty reference cache) for every test."""
+    engine = get_engine()
+    Base.metadata.drop_all(bind=engine)
+    create_schema(engine)
+    reference_cache.clear()
+    yield engine
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def statements():
+    """The SQL statements sent to the database while the test runs (clear it to start counting)."""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def make_purchases(db):
+    """
+    `make_purchases(count, items=3)` inserts one user, one shop, `items`
+    products and `count` purchases of one line per product, one day apart.
+    Returns the purchase ids, oldest first.
+    """
+    def make(count: int, items: int = 3) -> list[int]:
+        user_id = db.execute(insert(User).values(name="Test user", email="test@example.com")).inserted_primary_key[0]
+        shop_id = db.execute(insert(Shop).values(name="Test shop")).inserted_primary_key[0]
+        product_ids = [
+            db.execute(insert(Product).values(reference=f"P{n}", name=f"Product {n}")).inserted_primary_key[0]
+            for n in range(items)
+        ]
+        purchase_ids = []
+        for n in range(count):
+            purchase_id = db.execute(insert(Purchase).values(
+                user_id=user_id, shop_id=shop_id,
+                date=date(2024, 1, 1) + timedelta(days=n), total_amount=items * 2,
+            )).inserted_primary_key[0]
+            db.execute(insert(PurchaseItem), [
+                {"purchase_id": purchase_id, "product_id": product_id,
+                 "quantity": 1, "unit_price": 2, "subtotal": 2}
+                for product_id in product_ids
+            ])
+            purchase_ids.append(purchase_id)
+        db.commit()
+        return purchase_ids
+
+    return make
@@ -0,0 +1,56 @@
+"""The change feed: commit-ordered watermarks, so no committed write is missed."""
+
+from datetime import date
+
+from app.models.purchase import Purchase
+
+
+def _feed(client, since=None):
+    params = {} if since is None else {"since": since}
+    response = client.get("/feed/changes", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_feed_sends_writes_and_deletions_after_the_watermark(client, make_purchases):
+    first, second, third = make_purchases(3, items=2)
+    snapshot = _feed(client)
+    assert snapshot["full"]
+    assert snapshot["tables"]["purchases"]["id"] == [first, second, third]
+    items = snapshot["tables"]["purchase_items"]
+    lines = list(zip(items["id"], items["purchase_id"], items["product_id"]))
+    dropped = [item_id for item_id, purchase_id, product_id in lines if purchase_id == first and product_id == 1]
+    cascaded = [item_id for item_id, purchase_id, _ in lines if purchase_id == third]
+
+    created = client.post("/purchases/", json={
+        "user_id": 1, "shop_id": 1, "date": "2024-06-01",
+        "items": [{"product_id": 1, "quantity": 1, "price": 1}],
+    }).json()["id"]
+    # Keeps first's product 2 line and drops its product 1 line
+    client.put(f"/purchases/{first}", json={"items": [{"product_id": 2, "quantity": 1, "price": 5}]})
+    client.delete(f"/purchases/{third}")
+
+    changes = _feed(client, snapshot["watermark"])
+    assert changes["tables"]["purchases"]["id"] == [first, created]
+    assert set(changes["tables"]["purchase_items"]["purchase_id"]) == {first, created}
+    assert changes["deleted"]["purchases"] == [third]
+    assert changes["deleted"]["purchase_items"] == dropped + cascaded
+
+    unchanged = _feed(client, changes["watermark"])
+    assert unchanged["tables"]["purchases"]["id"] == []
+    assert unchanged["deleted"]["purchases"] == []
+
+
+def test_feed_does_not_skip_a_transaction_that_commits_late(client, db, make_purchases):
+    make_purchases(1, items=1)
+    watermark = _feed(client)["watermark"]
+
+    # Written before the next read but committed after it
+    late = Purchase(user_id=1, shop_id=1, date=date(2024, 6, 1), total_amount=1)
+    db.add(late)
+    db.flush()
+    missed = _feed(client, watermark)
+    db.commit()
+
+    assert late.id not in missed["tables"]["purchases"]["id"]
+    assert late.id in _feed(client, missed["watermark"])["tables"]["purchases"]["id"]
@@ -0,0 +1,145 @@
+"""
+Purchase endpoints: statement counts, which must not grow with the data a
+request reads or writes, the list's ETag, and line-item edits.
+"""
+
+from sqlalchemy import delete, update
+
+from app.models.product import Product
+from app.models.purchase import Purchase
+from app.models.purchase_item import PurchaseItem
+
+# Page: one query for the page rows, one for all their items, one for the ETag
+PAGE_STATEMENTS = 3
+
+
+def test_list_statement_count_does_not_grow_with_page_size(client, make_purchases, statements):
+    make_purchases(60, items=3)
+    client.get("/purchases/", params={"limit": 1})  # Connect and initialise the dialect
+
+    counts = {}
+    for limit in (5, 50):
+        statements.clear()
+        response = client.get("/purchases/", params={"limit": limit})
+        assert response.status_code == 200
+        page = response.json()["items"]
+        assert len(page) == limit
+        assert all(len(purchase["items"]) == 3 for purchase in page)
+        counts[limit] = len(statements)
+
+    assert counts == {5: PAGE_STATEMENTS, 50: PAGE_STATEMENTS}
+
+
+def test_not_modified_is_one_lookup(client, make_purchases, statements):
+    make_purchases(60, items=3)
+    etag = client.get("/purchases/").headers["ETag"]
+
+    statements.clear()
+    response = client.get("/purchases/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(statements) == 1
+
+
+def test_etag_changes_with_every_purchase_write(client, db, make_purchases):
+    first, second = make_purchases(2, items=1)
+    receipt = {"user_id": 1, "shop_id": 1, "date": "2024-06-01",
+               "items": [{"product_id": 1, "quantity": 1, "price": 1}]}
+    tags = [client.get("/purchases/").headers["ETag"]]
+
+    def tag_after(response):
+        assert response.status_code == 200
+        tags.append(client.get("/purchases/").headers["ETag"])
+
+    tag_after(client.post("/purchases/", json=receipt))
+    tag_after(client.put(f"/purchases/{first}", json={"items": [{"product_id": 1, "quantity": 2, "price": 1}]}))
+    tag_after(client.delete(f"/purchases/{second}"))
+
+    # Core statements run through a session (as the importers do) count too
+    db.execute(update(Purchase).where(Purchase.id == first).values(discount=1))
+    db.commit()
+    tags.append(client.get("/purchases/").headers["ETag"])
+
+    assert len(set(tags)) == len(tags)
+
+
+def test_create_statement_count_does_not_grow_with_items(client, make_purchases, statements):
+    make_purchases(1, items=20)
+    receipt = {"user_id": 1, "shop_id": 1, "date": "2024-06-01"}
+    client.post("/purchases/", json={**receipt, "items": [{"product_id": 1, "quantity": 1, "price": 1}]})
+
+    counts = {}
+    for size in (1, 20):
+        statements.clear()
+        items = [{"product_id": n, "quantity": 1, "price": 1} for n in range(1, size + 1)]
+        response = client.post("/purchases/", json={**receipt, "items": items})
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == size
+        counts[size] = len(statements)
+
+    assert counts[1] == counts[20]
+
+
+def test_bulk_statement_count_grows_only_by_header_inserts(client, make_purchases, statements):
+    make_purchases(1, items=3)
+    record = {"user_id": 1, "shop_id": 1, "date": "2024-06-01",
+              "items": [{"product_id": n, "quantity": 1, "price": 1} for n in (1, 2, 3)]}
+    client.post("/purchases/bulk", json=[record])
+
+    counts = {}
+    for size in (10, 100):
+        statements.clear()
+        response = client.post("/purchases/bulk", json=[record] * size)
+        assert response.status_code == 200
+        report = response.json()
+        assert report["created"] == size
+        assert all(result["purchase_id"] for result in report["results"])
+        counts[size] = len(statements)
+
+    # The ORM inserts each header on its own to learn its id; nothing else
+    # (such as reloading the ids after commit) may run per record
+    assert counts[100] - counts[10] == 90
+
+
+def test_update_rejects_a_line_id_listed_twice(client, make_purchases):
+    purchase_id = make_purchases(1, items=1)[0]
+    item_id = client.get("/purchases/").json()["items"][0]["items"][0]["id"]
+    line = {"id": item_id, "product_id": 1, "quantity": 1, "price": 1}
+
+    response = client.put(f"/purchases/{purchase_id}", json={"items": [line, line]})
+    assert response.status_code == 400
+
+    purchase = client.get("/purchases/").json()["items"][0]
+    assert purchase["total_amount"] == 2
+    assert [item["subtotal"] for item in purchase["items"]] == [2]
+
+
+def test_update_total_matches_the_resulting_lines(client, make_purchases):
+    purchase_id = make_purchases(1, items=3)[0]
+    first, second, _ = client.get("/purchases/").json()["items"][0]["items"]
+    items = [
+        {"id": first["id"], "product_id": 1, "quantity": 3, "price": 1.5},  # edited
+        {"product_id": 2, "quantity": 1, "price": 2},                      # unchanged, matched by product
+        {"product_id": 1, "quantity": 1, "price": 4},                      # new line
+    ]                                                                      # product 3 dropped
+
+    response = client.put(f"/purchases/{purchase_id}", json={"items": items})
+    assert response.status_code == 200
+    purchase = response.json()
+    assert sorted(item["subtotal"] for item in purchase["items"]) == [2, 4, 4.5]
+    assert purchase["total_amount"] == 10.5
+    assert second["id"] in {item["id"] for item in purchase["items"]}
+
+
+def test_create_rejects_a_product_deleted_after_it_was_cached(client, db, make_purchases):
+    make_purchases(1, items=2)
+    receipt = {"user_id": 1, "shop_id": 1, "date": "2024-06-01",
+               "items": [{"product_id": 2, "quantity": 1, "price": 1}]}
+    assert client.post("/purchases/", json=receipt).status_code == 200
+
+    # Deleted behind this worker's back, e.g. by another worker
+    db.execute(delete(PurchaseItem).where(PurchaseItem.product_id == 2))
+    db.execute(delete(Product).where(Product.id == 2))
+    db.commit()
+
+    response = client.post("/purchases/", json=receipt)
+    assert response.status_code == 404
@@ -0,0 +1,154 @@
+"""
+Query plans of the statements the app actually sends.
+
+Each case drives real endpoints or the importer, records every statement it
+sends (with its parameters), and asks SQLite for the plan of each one
+(`EXPLAIN QUERY PLAN`). A case fails when a large table is read in full, or
+when an ordered read needs a separate sort step: the regressions a dropped
+index or an unsargable rewrite would cause.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.database import SessionLocal, get_engine
+from app.importers.bulk import bulk_session_factory
+from app.importers.orders import import_orders
+from app.importers.pipeline import ImportRun
+from app.importers.products import import_products
+from app.services import spend_rollup
+
+# Tables whose size grows with the data, which no statement may read in full
+LARGE = {"purchases", "purchase_items", "products", "monthly_spend", "change_log", "import_hashes"}
+
+# Statements without a plan worth checking: INSERT ... VALUES, the schema, our own EXPLAINs
+_UNPLANNED = re.compile(r"\s*(INSERT\b(?!.*\bSELECT\b)|CREATE|PRAGMA|EXPLAIN)", re.I | re.S)
+
+
+@pytest.fixture
+def sent():
+    """(statement, parameters) of every statement sent while the test runs."""
+    executed: list[tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not _UNPLANNED.match(statement):
+            executed.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+def _problems(statement: str, parameters, ordered: str | None) -> list[str]:
+    with get_engine().connect() as connection:
+        plan = [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    must_not_sort = ordered is not None and re.search(rf"\bFROM {ordered}\b.*\bORDER BY\b", statement, re.S)
+    problems = []
+    for detail in plan:
+        scan = re.match(r"SCAN (\w+)(?: AS \w+)?$", detail)
+        if scan and scan.group(1) in LARGE:
+            problems.append(f"full scan of {scan.group(1)}")
+        if must_not_sort and "TEMP B-TREE FOR ORDER BY" in detail:
+            problems.append("sorts instead of reading an index in order")
+    return [f"{problem} in {' '.join(statement.split())}" for problem in problems]
+
+
+def assert_indexed(sent, ordered: str | None = None):
+    """No statement in `sent` scans a large table, or sorts rows it reads from table `ordered`."""
+    assert sent, "nothing was recorded"
+    problems = [
+        problem
+        for statement, parameters in list(sent)
+        for problem in _problems(statement, parameters, ordered)
+    ]
+    assert not problems, "\n".join(problems)
+
+
+# ── Cases ───────────────────────────────────────────────
+
+RECEIPT = {"user_id": 1, "shop_id": 1, "date": "2024-06-01",
+           "items": [{"product_id": 1, "quantity": 1, "price": 1}]}
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"user_id": 1, "date_from": "2024-01-01", "date_to": "2024-01-31"},
+    {"shop_id": 1},
+], ids=["all", "user and date range", "shop"])
+def test_purchase_list_pages(client, make_purchases, sent, filters):
+    make_purchases(20)
+    first = client.get("/purchases/", params={**filters, "limit": 5})
+    client.get("/purchases/", params={**filters, "limit": 5, "cursor": first.json()["next_cursor"]})
+    client.get("/purchases/", params={**filters, "limit": 5}, headers={"If-None-Match": first.headers["ETag"]})
+    assert_indexed(sent, ordered="purchases")
+
+
+def test_purchase_export_for_a_user_and_date_range(client, make_purchases, sent):
+    make_purchases(20)
+    params = {"user_id": 1, "date_from": "2024-01-01", "date_to": "2024-01-31"}
+    response = client.get("/purchases/export", params=params)
+    assert response.status_code == 200
+    assert_indexed(sent)
+
+
+def test_purchase_writes(client, make_purchases, sent):
+    purchase_id = make_purchases(20)[0]
+    created = client.post("/purchases/", json=RECEIPT).json()["id"]
+    client.put(f"/purchases/{purchase_id}", json={"date": "2024-05-01", "items": RECEIPT["items"]})
+    client.post("/purchases/bulk", json=[RECEIPT] * 3)
+    client.delete(f"/purchases/{created}")
+    client.put("/products/1", json={"category": "Moved"})
+    assert_indexed(sent)
+
+
+@pytest.mark.parametrize("path", ["summary", "by-period", "by-shop", "by-user", "by-category"])
+@pytest.mark.parametrize("dates", [
+    {"date_from": "2024-01-01", "date_to": "2024-01-31"},
+    {"date_from": "2024-01-05", "date_to": "2024-01-20"},
+], ids=["whole months", "part of a month"])
+def test_analytics(client, db, make_purchases, sent, path, dates):
+    make_purchases(20)
+    spend_rollup.rebuild(db)
+    db.commit()
+    sent.clear()
+    assert client.get(f"/analytics/{path}", params=dates).status_code == 200
+    assert_indexed(sent)
+
+
+def test_change_feed_since_a_watermark(client, make_purchases, sent):
+    first, second = make_purchases(2)
+    watermark = client.get("/feed/changes").json()["watermark"]
+    client.put(f"/purchases/{first}", json={"items": RECEIPT["items"]})
+    client.delete(f"/purchases/{second}")
+    sent.clear()
+    client.get("/feed/changes", params={"since": watermark})
+    assert_indexed(sent)
+
+
+@pytest.mark.parametrize("bulk", [False, True], ids=["rows", "bulk"])
+def test_importer(tmp_path, make_purchases, sent, bulk):
+    make_purchases(20)
+    exports = {
+        "products.csv": "Refencia;Descripcion;Marca\nP0;Product 0;Moved\nN1;New product;General\n",
+        "orders.csv": "Numero de pedido;Fecha;Total\n100;01/02/2024;3,00\n101;02/02/2024;2,00\n",
+        "lines.csv": (
+            "Numero de pedido;Referencia producto;Unidades;Precio\n"
+            "100;P0;1;1,00\n100;N1;1;2,00\n101;P1;1;2,00\n"
+        ),
+    }
+    for name, content in exports.items():
+        (tmp_path / name).write_text(content, encoding="cp1252")
+
+    engine = get_engine()
+    factory = bulk_session_factory(engine) if bulk else SessionLocal
+    for _ in range(2):  # Then again, unchanged
+        run = ImportRun(factory, checkpoint_path=str(tmp_path / "checkpoint.json"), chunk_size=100, bulk=bulk)
+        import_products(run, str(tmp_path / "products.csv"))
+        import_orders(run, str(tmp_path / "orders.csv"), str(tmp_path / "lines.csv"), 1, 1)
+        run.finish(True)
+    assert_indexed(sent)
@@ -0,0 +1,64 @@
+"""The monthly_spend rollup, kept in step by the write paths, must always equal a full recompute."""
+
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.models.monthly_spend import MonthlySpend
+from app.services import spend_rollup
+
+
+def _rollup(db) -> dict:
+    rows = db.execute(select(MonthlySpend)).scalars()
+    return {
+        (row.user_id, row.shop_id, row.category, row.month): (Decimal(row.total_amount), row.item_count, row.receipt_count)
+        for row in rows
+    }
+
+
+def _recomputed(db) -> dict:
+    return {
+        tuple(row[column] for column in spend_rollup.CELL_COLUMNS):
+            (Decimal(row["total_amount"]), row["item_count"], row["receipt_count"])
+        for row in spend_rollup._aggregate_rows(db, [])
+    }
+
+
+def assert_in_step(db):
+    db.rollback()  # Read what the requests committed
+    assert _rollup(db) == _recomputed(db)
+
+
+def test_write_paths_keep_the_rollup_in_step(client, db, make_purchases):
+    make_purchases(3, items=2)  # Inserted directly: not in the rollup yet
+    spend_rollup.rebuild(db)
+    assert_in_step(db)
+
+    line = {"product_id": 1, "quantity": 2, "price": 1.25}
+    created = client.post("/purchases/", json={"user_id": 1, "shop_id": 1, "date": "2024-01-02", "items": [line]})
+    assert created.status_code == 200
+    assert_in_step(db)
+
+    # Same cell, through the bulk endpoint
+    response = client.post("/purchases/bulk", json=[
+        {"user_id": 1, "shop_id": 1, "date": "2024-01-20", "items": [line, {**line, "product_id": 2}]},
+    ] * 3)
+    assert response.json()["created"] == 3
+    assert_in_step(db)
+
+    # Move a purchase to another month and change its lines
+    purchase_id = created.json()["id"]
+    response = client.put(f"/purchases/{purchase_id}", json={
+        "date": "2024-03-05", "items": [{"product_id": 2, "quantity": 1, "price": 9}],
+    })
+    assert response.status_code == 200
+    assert_in_step(db)
+
+    # Re-categorising a product moves its spend to the new category
+    assert client.put("/products/2", json={"category": "Cosmetics"}).status_code == 200
+    assert_in_step(db)
+
+    # Deleting the only purchase in a cell removes the cell's rows
+    assert client.delete(f"/purchases/{purchase_id}").status_code == 200
+    assert_in_step(db)
+    assert not any(month == "2024-03" for _, _, _, month in _rollup(db))
@@ -0,0 +1,19 @@
+-- ═══════════════════════════════════════════════════════════
+-- SmartSpend — Change feed columns
+-- Adds the timestamps and tombstone table used by GET /feed/changes
+-- to an existing database. New databases get them from the models.
+-- ═══════════════════════════════════════════════════════════
+
+USE smartspend;
+
+ALTER TABLE products   ADD COLUMN updated_at DATETIME NULL;
+ALTER TABLE shops      ADD COLUMN updated_at DATETIME NULL;
+ALTER TABLE categories ADD COLUMN updated_at DATETIME NULL;
+
+CREATE TABLE IF NOT EXISTS tombstones (
+    id          INT AUTO_INCREMENT PRIMARY KEY,
+    table_name  VARCHAR(50)   NOT NULL,
+    record_id   INT           NOT NULL,
+    deleted_at  DATETIME      NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_tombstones_deleted_at (deleted_at)
+) ENGINE=InnoDB;
@@ -0,0 +1,20 @@
+-- ═══════════════════════════════════════════════════════════
+-- SmartSpend — Change log
+-- Replaces the tombstones table: GET /feed/changes now reads every
+-- committed write and deletion from change_log by commit version.
+-- Consumers holding a timestamp watermark need one full load.
+-- New databases get it from the models.
+-- ═══════════════════════════════════════════════════════════
+
+USE smartspend;
+
+CREATE TABLE IF NOT EXISTS change_log (
+    id          INT AUTO_INCREMENT PRIMARY KEY,
+    version     BIGINT       NOT NULL,
+    table_name  VARCHAR(50)  NOT NULL,
+    record_id   INT          NOT NULL,
+    deleted     BOOLEAN      NOT NULL DEFAULT FALSE,
+    INDEX ix_change_log_table_version (table_name, version)
+) ENGINE=InnoDB;
+
+DROP TABLE IF EXISTS tombstones;
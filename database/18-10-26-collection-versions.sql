@@ -0,0 +1,12 @@
+-- ═══════════════════════════════════════════════════════════
+-- SmartSpend — Collection write versions
+-- Adds the version counters the purchase list's ETag is built from
+-- to an existing database. New databases get it from the models.
+-- ═══════════════════════════════════════════════════════════
+
+USE smartspend;
+
+CREATE TABLE IF NOT EXISTS collection_versions (
+    name     VARCHAR(50)  NOT NULL PRIMARY KEY,
+    version  BIGINT       NOT NULL DEFAULT 0
+) ENGINE=InnoDB;
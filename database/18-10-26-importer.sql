@@ -0,0 +1,17 @@
+-- ═══════════════════════════════════════════════════════════
+-- SmartSpend — Importer columns
+-- Adds the order number key and the content-hash table used by
+-- `python -m app.importers` to an existing database. New databases
+-- get them from the models.
+-- ═══════════════════════════════════════════════════════════
+
+USE smartspend;
+
+ALTER TABLE purchases ADD COLUMN order_number VARCHAR(50) NULL UNIQUE AFTER date;
+
+CREATE TABLE IF NOT EXISTS import_hashes (
+    entity        VARCHAR(20)   NOT NULL,
+    natural_key   VARCHAR(100)  NOT NULL,
+    content_hash  VARCHAR(32)   NOT NULL,
+    PRIMARY KEY (entity, natural_key)
+) ENGINE=InnoDB;
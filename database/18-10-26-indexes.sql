@@ -0,0 +1,25 @@
+-- ═══════════════════════════════════════════════════════════
+-- SmartSpend — Secondary indexes
+-- Adds the indexes behind the purchase list, export, analytics and
+-- importer queries to an existing database. New databases get them
+-- from the models. The plan checks live in
+-- `pytest tests/test_query_plans.py` (run from backend/).
+-- ═══════════════════════════════════════════════════════════
+
+USE smartspend;
+
+-- Purchase list / export / analytics: optional user or shop filter,
+-- date range, newest first. InnoDB appends the primary key to every
+-- secondary index, so each also covers the (date, id) keyset order.
+CREATE INDEX ix_purchases_date      ON purchases (date);
+CREATE INDEX ix_purchases_user_date ON purchases (user_id, date);
+CREATE INDEX ix_purchases_shop_date ON purchases (shop_id, date);
+
+-- Items of a purchase (page loads, item replacement, change feed) and
+-- purchases containing a product (rollup refresh on re-categorisation).
+-- These replace the indexes MySQL created implicitly for the foreign keys.
+CREATE INDEX ix_purchase_items_purchase_id ON purchase_items (purchase_id);
+CREATE INDEX ix_purchase_items_product_id  ON purchase_items (product_id);
+
+-- Category breakdowns match products to categories by name
+CREATE INDEX ix_products_category ON products (category);
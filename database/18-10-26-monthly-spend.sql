@@ -0,0 +1,23 @@
+-- ═══════════════════════════════════════════════════════════
+-- SmartSpend — Monthly spend rollup
+-- Adds the table behind the category breakdowns to an existing
+-- database. New databases get it from the models. The purchase and
+-- product write paths update it in place, so fill it once with
+-- `python -m app.services.spend_rollup` right after applying this
+-- script, before the API takes traffic.
+-- ═══════════════════════════════════════════════════════════
+
+USE smartspend;
+
+CREATE TABLE IF NOT EXISTS monthly_spend (
+    id             INT AUTO_INCREMENT PRIMARY KEY,
+    user_id        INT            NOT NULL,
+    shop_id        INT            NOT NULL,
+    category       VARCHAR(100)   NOT NULL,
+    month          VARCHAR(7)     NOT NULL,
+    total_amount   DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    item_count     INT            NOT NULL DEFAULT 0,
+    receipt_count  INT            NOT NULL DEFAULT 0,
+    UNIQUE KEY uq_monthly_spend_cell (user_id, shop_id, category, month),
+    INDEX ix_monthly_spend_month (month)
+) ENGINE=InnoDB;
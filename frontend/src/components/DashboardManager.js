@@ -10,6 +10,7 @@ import {
   deleteShop,
   updateShop,
   getProducts,
+  searchProducts,
   createProduct,
   deleteProduct,
   updateProduct,
@@ -17,12 +18,18 @@ import {
   createCategory,
   deleteCategory,
   updateCategory,
-  getPurchases,
   deletePurchase,
+  getSpendSummary,
+  getSpendBreakdown,
 } from "../services/api";
 import TransactionList from "./TransactionList";
 import "./DashboardManager.css";
 
+const eurFmt = new Intl.NumberFormat("de-DE", {
+  style: "currency",
+  currency: "EUR",
+});
+
 /* ══════════════════════════════════════════════════════════
    Reusable sub-components
    ══════════════════════════════════════════════════════════ */
@@ -404,6 +411,7 @@ function ProductsManagePanel({ onBack }) {
   const [showAdd, setShowAdd] = useState(false);
   const [editId, setEditId] = useState(null);
   const [searchQuery, setSearchQuery] = useState("");
+  const [searchResults, setSearchResults] = useState([]);
   const [form, setForm] = useState({
     name: "",
     reference: "",
@@ -439,16 +447,23 @@ function ProductsManagePanel({ onBack }) {
     [categories]
   );
 
-  // Filter products by search query
-  const filteredProducts = useMemo(() => {
-    if (!searchQuery.trim()) return products;
-    const q = searchQuery.toLowerCase();
-    return products.filter(
-      (p) =>
-        (p.name && p.name.toLowerCase().includes(q)) ||
-        (p.reference && p.reference.toLowerCase().includes(q))
-    );
-  }, [products, searchQuery]);
+  // Search server-side (indexed) once typing pauses
+  useEffect(() => {
+    const q = searchQuery.trim();
+    if (!q) return undefined;
+    let stale = false;
+    const timer = setTimeout(() => {
+      searchProducts(q)
+        .then((results) => !stale && setSearchResults(results))
+        .catch(() => {});
+    }, 150);
+    return () => {
+      stale = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery, products]);
+
+  const filteredProducts = searchQuery.trim() ? searchResults : products;
 
   const resetForm = () => {
     setForm({ name: "", reference: "", category: "", unit_type: "unit" });
@@ -781,6 +796,111 @@ function BrandsManagePanel({ onBack }) {
   );
 }
 
+/* ══════════════════════════════════════════════════════════
+   Panel: Spending
+   ══════════════════════════════════════════════════════════ */
+
+const SPEND_GROUPS = [
+  { key: "category", label: "By Category", column: "Category" },
+  { key: "shop", label: "By Shop", column: "Shop" },
+  { key: "period", label: "By Month", column: "Month" },
+];
+
+// Totals are aggregated by the API, so the browser never loads every purchase
+function SpendingPanel({ onBack, refreshKey }) {
+  const [summary, setSummary] = useState(null);
+  const [groupBy, setGroupBy] = useState("category");
+  const [groups, setGroups] = useState([]);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    getSpendSummary()
+      .then(setSummary)
+      .catch(() => {});
+  }, [refreshKey]);
+
+  useEffect(() => {
+    setLoading(true);
+    getSpendBreakdown(groupBy)
+      .then((data) => setGroups(data.groups))
+      .catch(() => setGroups([]))
+      .finally(() => setLoading(false));
+  }, [groupBy, refreshKey]);
+
+  return (
+    <div className="panel">
+      <PanelHeader title="Spending" onBack={onBack} />
+      <div className="panel-body">
+        {summary && (
+          <div className="spend-summary">
+            <div className="spend-stat">
+              <span className="spend-stat-label">Total spent</span>
+              <span className="spend-stat-value">
+                {eurFmt.format(summary.total_spent)}
+              </span>
+            </div>
+            <div className="spend-stat">
+              <span className="spend-stat-label">Purchases</span>
+              <span className="spend-stat-value">{summary.purchase_count}</span>
+            </div>
+            <div className="spend-stat">
+              <span className="spend-stat-label">Items</span>
+              <span className="spend-stat-value">{summary.item_count}</span>
+            </div>
+            <div className="spend-stat">
+              <span className="spend-stat-label">Average purchase</span>
+              <span className="spend-stat-value">
+                {eurFmt.format(summary.average_purchase)}
+              </span>
+            </div>
+          </div>
+        )}
+
+        <div className="tab-bar">
+          {SPEND_GROUPS.map((g) => (
+            <button
+              key={g.key}
+              className={`tab-btn${groupBy === g.key ? " active" : ""}`}
+              onClick={() => setGroupBy(g.key)}
+            >
+              {g.label}
+            </button>
+          ))}
+        </div>
+
+        {loading ? (
+          <p className="panel-loading">Loading spending…</p>
+        ) : groups.length === 0 ? (
+          <p className="panel-empty">No purchases found.</p>
+        ) : (
+          <div className="data-table-wrapper">
+            <table className="data-table">
+              <thead>
+                <tr>
+                  <th>{SPEND_GROUPS.find((g) => g.key === groupBy).column}</th>
+                  <th>Purchases</th>
+                  <th>Total</th>
+                  <th>Average</th>
+                </tr>
+              </thead>
+              <tbody>
+                {groups.map((g) => (
+                  <tr key={g.key}>
+                    <td>{g.label || g.key}</td>
+                    <td>{g.purchase_count}</td>
+                    <td>{eurFmt.format(g.total_spent)}</td>
+                    <td>{eurFmt.format(g.average_purchase)}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        )}
+      </div>
+    </div>
+  );
+}
+
 /* ══════════════════════════════════════════════════════════
    DashboardManager — main export
    ══════════════════════════════════════════════════════════ */
@@ -818,6 +938,12 @@ function DashboardManager({ refreshKey, onRefresh, setEditingTransaction }) {
           subtitle="Products, categories & brands"
           onClick={() => setCurrentView("products")}
         />
+        <DataCard
+          icon="📊"
+          title="Spending"
+          subtitle="Totals by category, shop & month"
+          onClick={() => setCurrentView("spending")}
+        />
       </div>
     );
   }
@@ -834,6 +960,8 @@ function DashboardManager({ refreshKey, onRefresh, setEditingTransaction }) {
         setEditingTransaction={setEditingTransaction}
       />
     );
+  if (currentView === "spending")
+    return <SpendingPanel onBack={goGrid} refreshKey={refreshKey} />;
   if (currentView === "products")
     return (
       <ProductsGridMenu
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import {
-  getPurchases,
+  getPurchasesPage,
   getUsers,
   getProducts,
   getShops,
@@ -18,11 +18,14 @@ function TransactionList({ refreshKey, onRefresh, setEditingTransaction }) {
   const [productMap, setProductMap] = useState({});
   const [shopMap, setShopMap] = useState({});
   const [loading, setLoading] = useState(true);
+  // The API returns purchases one page at a time, newest first
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     setLoading(true);
-    Promise.all([getPurchases(), getUsers(), getProducts(), getShops()])
-      .then(([purchaseData, users, products, shops]) => {
+    Promise.all([getPurchasesPage(), getUsers(), getProducts(), getShops()])
+      .then(([page, users, products, shops]) => {
         const uMap = {};
         users.forEach((u) => {
           uMap[u.id] = u.name;
@@ -41,12 +44,27 @@ function TransactionList({ refreshKey, onRefresh, setEditingTransaction }) {
         });
         setShopMap(sMap);
 
-        setPurchases(purchaseData);
+        setPurchases(page.items);
+        setNextCursor(page.next_cursor);
       })
       .catch((err) => console.error("Failed to fetch data:", err))
       .finally(() => setLoading(false));
   }, [refreshKey]);
 
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await getPurchasesPage({ cursor: nextCursor });
+      setPurchases((loaded) => [...loaded, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error("Failed to load more purchases:", err);
+      alert("Failed to load more purchases.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id) => {
     if (!window.confirm("Delete this purchase and all its items?")) return;
     try {
@@ -145,6 +163,16 @@ function TransactionList({ refreshKey, onRefresh, setEditingTransaction }) {
           </div>
         );
       })}
+
+      {nextCursor && (
+        <button
+          className="btn btn-primary"
+          onClick={handleLoadMore}
+          disabled={loadingMore}
+        >
+          {loadingMore ? "Loading..." : "Load more"}
+        </button>
+      )}
     </div>
   );
 }
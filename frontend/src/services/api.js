@@ -33,6 +33,9 @@ export const createProduct = (data) =>
 export const getProducts = () =>
   api.get("/products/").then((res) => res.data);
 
+export const searchProducts = (q, limit = 50) =>
+  api.get("/products/search", { params: { q, limit } }).then((res) => res.data);
+
 export const updateProduct = (id, data) =>
   api.put(`/products/${id}`, data).then((res) => res.data);
 
@@ -72,8 +75,10 @@ export const deleteShop = (id) =>
 export const createPurchase = (data) =>
   api.post("/purchases/", data).then((res) => res.data);
 
-export const getPurchases = () =>
-  api.get("/purchases/").then((res) => res.data);
+// Returns one page, newest first: { items, next_cursor }. Pass next_cursor
+// back as `cursor` to fetch the following page; it is null on the last page.
+export const getPurchasesPage = (params = {}) =>
+  api.get("/purchases/", { params }).then((res) => res.data);
 
 export const deletePurchase = (id) =>
   api.delete(`/purchases/${id}`).then((res) => res.data);
@@ -81,4 +86,12 @@ export const deletePurchase = (id) =>
 export const updatePurchase = (id, data) =>
   api.put(`/purchases/${id}`, data).then((res) => res.data);
 
+// ── Analytics ─────────────────────────────────
+
+export const getSpendSummary = (params = {}) =>
+  api.get("/analytics/summary", { params }).then((res) => res.data);
+
+export const getSpendBreakdown = (groupBy, params = {}) =>
+  api.get(`/analytics/by-${groupBy}`, { params }).then((res) => res.data);
+
 export default api;